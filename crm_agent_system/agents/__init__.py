@@ -1,11 +1,12 @@
 from .orchestrator import OrchestratorAgent
 from .research import ResearchAgent
 from .analysis import AnalysisAgent
-from .validator import ValidatorAgent
+from .validator import ValidatorAgent, CompletenessGate
 
 __all__ = [
     "OrchestratorAgent",
     "ResearchAgent",
     "AnalysisAgent",
     "ValidatorAgent",
+    "CompletenessGate",
 ]
@@ -52,10 +52,11 @@ class AnalysisAgent:
                 logger.debug(f"Integration count {n} = {len(d.integrations)} (confidence={d.confidence_score})")
         scores = self.calculate_scores(crm_data)
         recs = self.generate_recommendations(scores)
+        detailed = {k: v.model_dump() if isinstance(v, CRMData) else {} for k, v in crm_data.items()}
         prompt = f"""
         Create a concise executive summary comparing these CRMs for small B2B businesses:
         Scores: {json.dumps(scores, indent=2)}
-        Data: {json.dumps({k: v.dict() if isinstance(v, CRMData) else {} for k, v in crm_data.items()}, indent=2)}
+        Data: {json.dumps(detailed, indent=2)}
         Focus on key differentiators and practical recommendations. Keep under 300 words.
         """
         response = await self.llm.ainvoke([{"role": "system", "content": prompt}])
@@ -68,7 +69,7 @@ class AnalysisAgent:
             "summary": (response.content or "") + disclaimer,
             "scores": scores,
             "recommendations": recs,
-            "detailed_data": {k: v.dict() if isinstance(v, CRMData) else {} for k, v in crm_data.items()},
+            "detailed_data": detailed,
             "timestamp": datetime.now().isoformat(),
         }
         logger.info("Analysis complete")
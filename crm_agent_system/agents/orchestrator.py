@@ -1,7 +1,7 @@
 import logging
 from typing import Dict, Any
 from ..config import config
-from ..models import AgentState
+from ..models import AgentState, completeness_score
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +32,23 @@ class OrchestratorAgent:
             return state
 
         crm_data = state.get("crm_data", {})
+        attempts = state.get("research_attempts") or {}
+        retry = [c for c in state.get("precheck_retry") or [] if attempts.get(c, 0) < config.max_research_attempts]
         if not crm_data or len(crm_data) < len(config.crms):
             state["current_task"] = "research"
+        elif retry:
+            # Re-research flagged by the pre-analysis gate. Bounded by max_research_attempts
+            # (exhausted CRMs fall through to analyze) and kept out of convergence_history,
+            # so repeated retry rounds can never end the run before analysis.
+            state["current_task"] = "research"
+            return state
         elif not state.get("final_comparison"):
             state["current_task"] = "analyze"
         else:
             validation = state.get("validation_results", [])
             if validation:
                 last = validation[-1]
-                avg_score = sum(v.get("score", 0) for v in last.values()) / max(len(last), 1)
+                avg_score = sum(completeness_score(m) for m in last.values()) / max(len(last), 1)
                 if avg_score < config.validation_threshold:
                     state["current_task"] = "research"
                 else:
@@ -2,12 +2,30 @@ import json
 import logging
 import asyncio
 from datetime import datetime
-from typing import List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
+from langgraph.config import get_stream_writer
 from ..config import config
 from ..models import AgentState, CRMData
+from ..dedup import dedup_snippets
+from ..model_router import ModelRouter
+from ..query_plan import get_query_planner, route_results
+from ..search_depth import get_depth_history, next_depth, plan_expansion
+from ..serialization import crm_from_json
+from ..utils import append_bounded
+from ..workqueue import dispatch_and_wait, get_work_queue
+from ..worker import RESEARCH_JOB, research_payload
 
 logger = logging.getLogger(__name__)
 
+
+def _stream_writer() -> Callable[[Any], None]:
+    """LangGraph's custom stream writer, or a no-op when called outside a graph run."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda chunk: None
+
+
 STRUCTURE_GUIDE = (
     "Return ONLY a single JSON object with keys: name, pricing_tiers (list of objects with name, monthly_price, annual_price, user_limit, notes), "
     "features (object with core_features, automation, analytics, customization), integrations (list with name, category, notes), "
@@ -38,16 +56,23 @@ def _extract_json_fragment(text: str) -> Optional[str]:
 class ResearchAgent:
     """Collects raw aspect data via search tool then produces structured CRMData via LLM."""
 
-    def __init__(self, llm, search_tool):
+    def __init__(self, llm, search_tool, router: Optional[ModelRouter] = None):
         self.llm = llm
         self.search = search_tool
-        # Attempt to prepare a structured-output capable LLM for direct CRMData parsing
-        self._structured = None
-        try:  # pragma: no cover - depends on provider capabilities
-            if hasattr(llm, "with_structured_output"):
-                self._structured = llm.with_structured_output(CRMData)
-        except Exception:  # fallback silently
-            self._structured = None
+        self.router = router
+        self._structured_by_llm: Dict[int, object] = {}
+
+    def _structured_for(self, llm):
+        key = id(llm)
+        if key not in self._structured_by_llm:
+            structured = None
+            try:  # pragma: no cover - depends on provider capabilities
+                if hasattr(llm, "with_structured_output"):
+                    structured = llm.with_structured_output(CRMData)
+            except Exception:  # fallback silently
+                structured = None
+            self._structured_by_llm[key] = structured
+        return self._structured_by_llm[key]
 
     def _harvest_integration_candidates(self, raw_text: str) -> Set[str]:
         found: Set[str] = set()
@@ -59,15 +84,118 @@ class ResearchAgent:
             logger.debug(f"Harvested integration candidates for {raw_text[:20]}... -> {found}")
         return found
 
-    async def extract_structured_data(self, crm_name: str, raw_data: str, harvested: Set[str]) -> CRMData:
-        if self._structured:
+    async def _planned_search(self, crm_name: str) -> List[object]:
+        """Run the planner's queries for a CRM and regroup results per aspect (JSON payload or Exception each)."""
+        planner = get_query_planner()
+        plan = planner.plan(crm_name, config.aspects)
+        if config.adaptive_search:
+            calls = [
+                self._adaptive_search(crm_name, q.aspects[0], q.text) if len(q.aspects) == 1
+                else self.search.ainvoke({"crm_name": crm_name, "aspect": q.aspects[0], "query": q.text})
+                for q in plan.queries
+            ]
+        else:
+            calls = [self.search.ainvoke({"crm_name": crm_name, "aspect": q.aspects[0], "query": q.text}) for q in plan.queries]
+        raw_results = await asyncio.gather(*calls, return_exceptions=True)
+        per_aspect: dict = {a: [] for a in config.aspects}
+        errors: dict = {}
+        for q, raw in zip(plan.queries, raw_results):
+            items = None
+            if not isinstance(raw, Exception):
+                try:
+                    items = json.loads(raw)
+                except (TypeError, ValueError):
+                    items = None
+            if not isinstance(items, list):
+                for aspect in q.aspects:
+                    errors.setdefault(aspect, raw if isinstance(raw, Exception) else RuntimeError(str(raw)))
+                continue
+            for aspect, routed in route_results(q, items, INTEGRATION_KEYWORDS).items():
+                per_aspect[aspect].extend(routed)
+        planner.record(plan, per_aspect, INTEGRATION_KEYWORDS)
+        logger.debug("Planned search crm=%s calls=%d aspects=%d", crm_name, len(plan.queries), len(config.aspects))
+        return [
+            errors[a] if a in errors and not per_aspect[a] else json.dumps(per_aspect[a])
+            for a in config.aspects
+        ]
+
+    async def _adaptive_search(self, crm_name: str, aspect: str, query: str = "") -> str:
+        """Search an aspect starting at its learned depth, deepening while new evidence keeps arriving."""
+        history = get_depth_history()
+        depth = history.start_depth(aspect)
+        previous_depth = depth // 2
+        raw = await self.search.ainvoke({"crm_name": crm_name, "aspect": aspect, "max_results": depth, "query": query})
+        calls = 1
+        try:
+            items = json.loads(raw)
+        except (TypeError, ValueError):
+            return raw
+        if not isinstance(items, list):
+            return raw  # provider error object
+        saturation = depth
+        expansions = paid = 0
+        while True:
+            decision = plan_expansion(items[:previous_depth], items, aspect, INTEGRATION_KEYWORDS)
+            if expansions:  # did the last deeper call add evidence?
+                paid += decision["new_units"] >= config.adaptive_min_new_units
+            if len(items) < depth:  # provider exhausted
+                saturation = max(len(items), 1)
+                break
+            if not decision["expand"]:
+                saturation = max(previous_depth, 1)
+                break
+            if depth >= config.max_search_results or not history.expansion_pays(aspect):
+                saturation = depth
+                break
+            previous_depth, depth = depth, next_depth(depth)
+            deeper = json.loads(await self.search.ainvoke({"crm_name": crm_name, "aspect": aspect, "max_results": depth, "query": query}))
+            calls += 1
+            expansions += 1
+            if not isinstance(deeper, list):
+                break
+            items = deeper
+        history.record(aspect, saturation, expansions, paid)
+        logger.debug(
+            "Adaptive search crm=%s aspect=%s calls=%d depth=%d results=%d saturation=%d",
+            crm_name, aspect, calls, depth, len(items), saturation
+        )
+        return json.dumps(items)
+
+    def _dedup_collected(self, crm_name: str, collected: List[str]) -> List[str]:
+        """Drop duplicate snippets across aspect result payloads before extraction."""
+        groups = {}
+        passthrough = {}
+        for idx, payload in enumerate(collected):
+            try:
+                items = json.loads(payload)
+            except (TypeError, ValueError):
+                items = None
+            if isinstance(items, list):
+                groups[idx] = items
+            else:
+                passthrough[idx] = payload
+        if not groups:
+            return collected
+        kept, stats = dedup_snippets(groups)
+        if stats.dropped:
+            logger.info(
+                "Snippet dedup crm=%s total=%d dropped=%d (url=%d near=%d)",
+                crm_name, stats.total, stats.dropped, stats.url_duplicates, stats.near_duplicates
+            )
+        return [passthrough[i] if i in passthrough else json.dumps(kept[i]) for i in range(len(collected))]
+
+    async def extract_structured_data(self, crm_name: str, raw_data: str, harvested: Set[str], llm=None) -> Optional[CRMData]:
+        """Extract CRMData with ``llm`` (default: the agent's model). Returns None if the output cannot be parsed."""
+        llm = llm or self.llm
+        structured = self._structured_for(llm)
+        if structured:
             try:
                 prompt = (
                     f"Extract structured CRM data for '{crm_name}'. If information is missing, leave lists empty and set confidence_score <= 0.3.\n"
                     f"List each distinct integration/product/tool explicitly; do NOT hallucinate beyond snippets.\n"
                     f"Snippets: {raw_data}"
                 )
-                return await self._structured.ainvoke(prompt)
+                return await structured.ainvoke(prompt)
             except Exception as e:  # pragma: no cover
                 logger.warning(f"Structured extraction fallback for {crm_name}: {e}")
         # Fallback manual JSON extraction path
@@ -77,7 +205,7 @@ class ResearchAgent:
             f"LIST EVERY DISTINCT INTEGRATION NAME (tools, platforms, apps) mentioned.\n"
             f"RAW_SNIPPETS: {raw_data}\n{STRUCTURE_GUIDE}\nSTRICT: Output ONLY JSON with no commentary."
         )
-        response = await self.llm.ainvoke([{ "role": "system", "content": prompt }])
+        response = await llm.ainvoke([{ "role": "system", "content": prompt }])
         content = response.content if hasattr(response, 'content') else str(response)
         for attempt in ("direct", "fragment"):
             try:
@@ -99,23 +227,57 @@ class ResearchAgent:
             except Exception:
                 continue
         logger.error(f"Parse failure for {crm_name}: could not extract valid JSON")
-        return CRMData(name=crm_name, confidence_score=0.2)
+        return None
+
+    async def _extract_routed(self, crm_name: str, raw_data: str, harvested: Set[str]) -> CRMData:
+        """Extract on the fast model; re-ask the escalation model on a parse failure or low confidence."""
+        if self.router is None:
+            data = await self.extract_structured_data(crm_name, raw_data, harvested)
+            return self._finalize(crm_name, data or CRMData(name=crm_name, confidence_score=0.2), harvested)
+        chain = self.router.escalation_chain("extraction")
+        best: Optional[CRMData] = None
+        for i, model in enumerate(chain):
+            self.router.record(model, escalated_from=chain[i - 1] if i else None)
+            data = await self.extract_structured_data(crm_name, raw_data, harvested, self.router.client(model))
+            if data is None:
+                reason = "parse failure"
+            else:
+                data = self._finalize(crm_name, data, harvested)
+                if best is None or data.confidence_score > best.confidence_score:
+                    best = data
+                if data.confidence_score >= config.model_escalation_confidence:
+                    return data
+                reason = f"confidence {data.confidence_score:.2f}"
+            if i + 1 < len(chain):
+                logger.info("Escalating extraction crm=%s from=%s to=%s (%s)", crm_name, model, chain[i + 1], reason)
+        return best or self._finalize(crm_name, CRMData(name=crm_name, confidence_score=0.2), harvested)
 
     async def research_crm(self, crm_name: str) -> CRMData:
-        calls = [self.search.ainvoke({"crm_name": crm_name, "aspect": aspect}) for aspect in config.aspects]
-        results = await asyncio.gather(*calls, return_exceptions=True)
+        if config.query_planning:
+            results = await self._planned_search(crm_name)
+        else:
+            if config.adaptive_search:
+                calls = [self._adaptive_search(crm_name, aspect) for aspect in config.aspects]
+            else:
+                calls = [self.search.ainvoke({"crm_name": crm_name, "aspect": aspect}) for aspect in config.aspects]
+            results = await asyncio.gather(*calls, return_exceptions=True)
         collected: List[str] = []
         for aspect, result in zip(config.aspects, results):
             if isinstance(result, Exception):
                 logger.error(f"Search error {crm_name} {aspect}: {result}")
             else:
                 collected.append(str(result))
+        if config.dedup_enabled and collected:
+            collected = self._dedup_collected(crm_name, collected)
         # If we have zero snippets, short-circuit without LLM call for efficiency.
         if not collected:
             return CRMData(name=crm_name, confidence_score=0.1)
         raw_text = "\n".join(collected)
         harvested = self._harvest_integration_candidates(raw_text)
-        data = await self.extract_structured_data(crm_name, json.dumps(collected), harvested)
+        return await self._extract_routed(crm_name, json.dumps(collected), harvested)
+
+    def _finalize(self, crm_name: str, data: CRMData, harvested: Set[str]) -> CRMData:
+        """Integration enrichment, normalization and the evidence-based confidence heuristic."""
         # Second pass enrichment if integrations remain sparse but harvest larger
         if len(data.integrations) < 3 and len(harvested) >= 3:
             from ..models import Integration
@@ -171,25 +333,61 @@ class ResearchAgent:
             logger.debug(f"Confidence heuristic failed for {crm_name}: {e}")
         return data
 
+    async def _research_via_queue(self, pending: List[str], on_result: Callable[[str, object], None]) -> None:
+        """Dispatch research jobs to queue workers; ``on_result(crm, CRMData | Exception)`` as each finishes."""
+
+        def finished(index: int, result: object) -> None:
+            if not isinstance(result, Exception):
+                try:
+                    result = crm_from_json(result)
+                except Exception as e:
+                    result = e
+            on_result(pending[index], result)
+
+        await dispatch_and_wait(
+            get_work_queue(), RESEARCH_JOB, [research_payload(c) for c in pending], raw_results=True, on_result=finished
+        )
+
+    async def _research_local(self, pending: List[str], on_result: Callable[[str, object], None]) -> None:
+        async def one(crm: str):
+            try:
+                return crm, await self.research_crm(crm)
+            except Exception as e:
+                return crm, e
+
+        for next_done in asyncio.as_completed([one(c) for c in pending]):
+            on_result(*await next_done)
+
     async def __call__(self, state: AgentState) -> AgentState:
         crm_data = state.get("crm_data", {})
         research_status = state.get("research_status", {})
         pending = [c for c in config.crms if not research_status.get(c)]
         if pending:
-            results = await asyncio.gather(*[self.research_crm(c) for c in pending], return_exceptions=True)
-            for crm, result in zip(pending, results):
+            attempts = state.get("research_attempts") or {}
+            for crm in pending:
+                attempts[crm] = attempts.get(crm, 0) + 1
+            state["research_attempts"] = attempts
+            emit = _stream_writer()
+
+            def on_result(crm: str, result: object) -> None:
                 if isinstance(result, Exception):
-                    state.setdefault("error_log", []).append({
+                    state["error_log"] = append_bounded(state.get("error_log"), {
                         "timestamp": datetime.now().isoformat(),
                         "agent": "research",
                         "error": str(result),
                         "crm": crm
-                    })
+                    }, config.error_log_limit)
                     logger.error(f"Research failed for {crm}: {result}")
-                else:
-                    if isinstance(result, CRMData):
-                        crm_data[crm] = result
-                        research_status[crm] = True
+                elif isinstance(result, CRMData):
+                    crm_data[crm] = result
+                    research_status[crm] = True
+                    # Per-CRM update on the graph's "custom" stream, before the node returns
+                    emit({"crm": crm, "data": result})
+
+            if config.research_backend == "queue":
+                await self._research_via_queue(pending, on_result)
+            else:
+                await self._research_local(pending, on_result)
         state["crm_data"] = crm_data
         state["research_status"] = research_status
         logger.info(f"Research complete for {len(crm_data)} CRMs")
@@ -1,26 +1,96 @@
 import logging
-from typing import List, Dict
-from ..models import AgentState, CRMData
+import math
+import re
+from typing import List, Dict, Set, Tuple
+from ..models import AgentState, CRMData, Completeness, compact_report
 from ..config import config
+from ..utils import append_bounded
 
 logger = logging.getLogger(__name__)
 
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+def completeness_report(crm_data: Dict[str, CRMData]) -> Dict[str, Dict]:
+    """Completeness scoring backing the ``validate_data_completeness`` tool (25% per section).
+
+    Each entry also carries ``mask``, the ``Completeness`` flags of the sections present.
+    """
+    report = {}
+    for name, data in crm_data.items():
+        score = 0
+        max_score = 100
+        issues = []
+        mask = Completeness.NONE
+        if getattr(data, "pricing_tiers", None):
+            score += 25
+            mask |= Completeness.PRICING
+        else:
+            issues.append("Missing pricing information")
+        features = getattr(data, "features", None)
+        if features and features.core_features:
+            score += 25
+            mask |= Completeness.FEATURES
+        else:
+            issues.append("Missing feature details")
+        if getattr(data, "integrations", None):
+            score += 25
+            mask |= Completeness.INTEGRATIONS
+        else:
+            issues.append("Missing integration data")
+        if getattr(data, "limitations", None):
+            score += 25
+            mask |= Completeness.LIMITATIONS
+        else:
+            issues.append("Missing limitations")
+        report[name] = {"score": score / max_score, "issues": issues, "complete": score == max_score, "mask": int(mask)}
+    return report
+
+def normalize_feature(feature: str) -> str:
+    """Canonical token for a feature phrase (case, punctuation, separators and simple plurals ignored)."""
+    words = _NON_WORD.sub(" ", feature.lower()).split()
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+def feature_overlap_pairs(crm_data: Dict[str, CRMData], ratio: float = 0.8) -> List[Tuple[str, str]]:
+    """Return (crm, earlier_crm) pairs whose shared core features exceed ``ratio`` of crm's features.
+
+    Uses an inverted index (feature token -> earlier CRMs) probed only with each
+    set's rarest ``|F| - t + 1`` tokens, where ``t`` is the required overlap: any
+    CRM sharing ``t`` tokens must share one of them (prefix filter). Candidates are
+    then verified exactly, so results match the pairwise check without O(n^2) work.
+    """
+    sets: Dict[str, Set[str]] = {}
+    df: Dict[str, int] = {}
+    for name, data in crm_data.items():
+        if isinstance(data, CRMData):
+            tokens = {normalize_feature(f) for f in data.features.core_features} - {""}
+            sets[name] = tokens
+            for tok in tokens:
+                df[tok] = df.get(tok, 0) + 1
+    order = {name: i for i, name in enumerate(sets)}
+    index: Dict[str, List[str]] = {}
+    pairs: List[Tuple[str, str]] = []
+    for name, feats in sets.items():
+        if feats:
+            required = math.floor(ratio * len(feats)) + 1
+            prefix = sorted(feats, key=lambda t: (df[t], t))[: max(len(feats) - required + 1, 0)]
+            candidates = {other for tok in prefix for other in index.get(tok, ())}
+            for other in sorted(candidates, key=order.__getitem__):
+                if len(feats & sets[other]) >= required:
+                    pairs.append((name, other))
+        for tok in feats:
+            index.setdefault(tok, []).append(name)
+    return pairs
+
 class ValidatorAgent:
     def __init__(self, llm, validation_tool):
         self.llm = llm
         self.validate = validation_tool
 
     async def semantic_validation(self, crm_data: Dict[str, CRMData]) -> List[str]:
-        issues: List[str] = []
-        feature_sets: Dict[str, set] = {}
-        for name, data in crm_data.items():
-            if isinstance(data, CRMData):
-                feats = set(data.features.core_features)
-                for other, other_feats in feature_sets.items():
-                    overlap = feats & other_feats
-                    if overlap and len(overlap) > 0.8 * len(feats):
-                        issues.append(f"Suspicious feature overlap between {name} and {other}")
-                feature_sets[name] = feats
+        issues: List[str] = [
+            f"Suspicious feature overlap between {name} and {other}"
+            for name, other in feature_overlap_pairs(crm_data)
+        ]
         for name, data in crm_data.items():
             if isinstance(data, CRMData):
                 for tier in data.pricing_tiers:
@@ -32,7 +102,9 @@ class ValidatorAgent:
         crm_data = state.get("crm_data", {})
         validation_report = self.validate.invoke({"crm_data": crm_data})
         semantic_issues = await self.semantic_validation(crm_data)
-        state.setdefault("validation_results", []).append(validation_report)
+        state["validation_results"] = append_bounded(
+            state.get("validation_results"), compact_report(validation_report), config.validation_history_limit
+        )
         avg = 0.0
         if validation_report:
             avg = sum(v.get("score", 0) for v in validation_report.values()) / max(len(validation_report), 1)
@@ -42,3 +114,36 @@ class ValidatorAgent:
                     state.setdefault("research_status", {})[crm] = False
             state["current_task"] = "research"
         return state
+
+
+class CompletenessGate:
+    """Cheap pre-analysis check run right after research.
+
+    Reuses the completeness tool on freshly researched CRMs and flips
+    ``research_status`` back to False for those below
+    ``config.validation_threshold`` that still have research attempts left, so
+    they are re-researched before any summary LLM call is spent.
+    """
+    def __init__(self, validation_tool):
+        self.validate = validation_tool
+
+    def __call__(self, state: AgentState) -> AgentState:
+        crm_data = state.get("crm_data", {})
+        research_status = state.get("research_status", {})
+        attempts = state.get("research_attempts") or {}
+        retry: List[str] = []
+        if config.precheck_enabled and crm_data:
+            report = self.validate.invoke({"crm_data": crm_data})
+            for crm, entry in report.items():
+                if entry.get("score", 0) >= config.validation_threshold:
+                    continue
+                if attempts.get(crm, 0) >= config.max_research_attempts:
+                    logger.info(f"Pre-analysis gate: {crm} incomplete after {attempts.get(crm, 0)} attempts, accepting ({entry.get('issues')})")
+                    continue
+                research_status[crm] = False
+                retry.append(crm)
+            if retry:
+                logger.info(f"Pre-analysis gate: re-researching {retry} before analysis")
+        state["research_status"] = research_status
+        state["precheck_retry"] = retry
+        return state
@@ -19,6 +19,11 @@ class Config:
     llm_provider: str = "openai"
     llm_model: str = "gpt-4o-mini"
     llm_temperature: float = 0.3
+    # Per-task model routing ("" = llm_model). Extraction is re-asked on the "reask" model
+    # only when its output fails the CRMData parse or scores below model_escalation_confidence
+    model_routing: bool = True
+    llm_task_models: dict = field(default_factory=lambda: {"extraction": "", "summary": "", "reask": "gpt-4o"})
+    model_escalation_confidence: float = 0.4
     search_provider: str = "tavily"
     max_search_results: int = 8
     # Optional per-aspect query suffixes to enrich specificity
@@ -28,7 +33,66 @@ class Config:
         "integrations": "integrations app marketplace 2025 Zapier Slack",
         "limitations": "limitations drawbacks cons 2025",
     })
+    # Snippet dedup (URL canonicalization + MinHash/LSH) between search and extraction
+    dedup_enabled: bool = True
+    dedup_similarity_threshold: float = 0.8
+    dedup_shingle_size: int = 5
+    dedup_num_perm: int = 64
+    dedup_lsh_bands: int = 16
+    # Logging pipeline: JSON-lines run log and DEBUG sampling (per message template)
+    log_json: bool = os.getenv("CRM_LOG_JSON", "").lower() in {"1", "true", "yes"}
+    log_debug_sampling: bool = True
+    log_debug_rate_per_sec: float = 50.0
+    log_debug_sample_every: int = 20
+    log_debug_max_keys: int = 1024
+    # AgentState retention: keep the newest N validation reports / error log entries (0 = unbounded)
+    validation_history_limit: int = 3
+    error_log_limit: int = 50
+    # Query planning: merge aspect groups / split integrations based on recorded per-variant yield
+    query_planning: bool = False
+    query_plan_merge_groups: List[List[str]] = field(default_factory=lambda: [["pricing", "limitations"]])
+    query_plan_integration_splits: List[str] = field(default_factory=lambda: [
+        "integrations app marketplace 2025",
+        "native integrations Zapier Slack Gmail Outlook QuickBooks",
+    ])
+    query_plan_min_hits: float = 2.0
+    query_plan_split_gain: float = 1.5
+    query_plan_path: str = "output/query_plans.json"
+    # Stream table rows / NDJSON records per CRM while the graph runs (final sorted table at the end)
+    stream_report: bool = True
+    # --profile: sampling interval, top-N size, and regression flags for `profiling compare`
+    profile_dir: str = "output/profiles"
+    profile_interval: float = 0.005
+    profile_top_n: int = 30
+    profile_regression_threshold: float = 0.25
+    profile_min_share: float = 0.02
+    profile_regression_z: float = 3.0
+    # Columnar run history (scores, pricing, integration counts, confidence per CRM per run)
+    history_enabled: bool = True
+    history_dir: str = "output/history"
+    # Research execution: "local" (in-process gather) or "queue" (dispatch to worker processes)
+    research_backend: str = os.getenv("CRM_RESEARCH_BACKEND", "local")
+    queue_backend: str = "sqlite"
+    queue_path: str = os.getenv("CRM_QUEUE_PATH", "output/research_queue.db")
+    queue_lease_seconds: float = 120.0
+    queue_max_attempts: int = 3
+    queue_poll_interval: float = 0.5
+    queue_result_timeout: float = 900.0
+    queue_retention_seconds: float = 86400.0
+    # Adaptive per-aspect search depth (start shallow, deepen while marginal evidence yield holds)
+    adaptive_search: bool = False
+    adaptive_initial_depth: int = 3
+    adaptive_min_depth: int = 2
+    adaptive_min_new_units: int = 2
+    adaptive_history_alpha: float = 0.3
+    # Deeper calls re-send the query; keep deepening an aspect only while they pay off
+    adaptive_explore_expansions: int = 3
+    adaptive_min_expansion_payoff: float = 0.5
+    adaptive_history_path: str = "output/search_depth_history.json"
     max_iterations: int = 10
+    # Pre-analysis completeness gate: re-research incomplete CRMs before the summary LLM call
+    precheck_enabled: bool = True
+    max_research_attempts: int = 2
     validation_threshold: float = 0.8
     convergence_window: int = 2
     max_retries: int = 3
@@ -0,0 +1,182 @@
+"""Near-duplicate elimination for search snippets.
+
+Two stages run between search and extraction:
+1. Exact dedup on canonicalized URLs (scheme/host case, ``www.``, tracking params,
+   fragments and trailing slashes are ignored).
+2. Near-duplicate dedup on snippet content using word shingles + MinHash with
+   LSH banding; candidate pairs are confirmed by estimated Jaccard similarity.
+"""
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "ref_src", "mc_cid", "mc_eid"}
+_WORD_RE = re.compile(r"[a-z0-9$]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+@dataclass
+class DedupStats:
+    """Counts reported by a dedup pass."""
+    total: int = 0
+    url_duplicates: int = 0
+    near_duplicates: int = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.url_duplicates + self.near_duplicates
+
+    @property
+    def kept(self) -> int:
+        return self.total - self.dropped
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so syndicated/tracked variants of the same page compare equal."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    canonical = host + path
+    return f"{canonical}?{urlencode(sorted(query))}" if query else canonical
+
+
+def shingles(text: str, size: Optional[int] = None) -> Set[str]:
+    """Return the set of lowercase word ``size``-grams in ``text``."""
+    size = size or config.dedup_shingle_size
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Fixed-seed MinHash signatures over string shingle sets."""
+
+    def __init__(self, num_perm: Optional[int] = None, seed: int = 1):
+        self.num_perm = num_perm or config.dedup_num_perm
+        rng_state = hashlib.sha1(str(seed).encode()).digest()
+        self._params: List[Tuple[int, int]] = []
+        for i in range(self.num_perm):
+            rng_state = hashlib.sha1(rng_state + i.to_bytes(4, "little")).digest()
+            a = int.from_bytes(rng_state[:8], "little") % (_MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(rng_state[8:16], "little") % _MERSENNE_PRIME
+            self._params.append((a, b))
+
+    def signature(self, items: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in items]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    @staticmethod
+    def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        if not sig_a:
+            return 0.0
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class MinHashLSH:
+    """Banded LSH index returning previously inserted keys that may be similar."""
+
+    def __init__(self, num_perm: int, bands: Optional[int] = None):
+        bands = bands or config.dedup_lsh_bands
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[Tuple[int, ...], List[Any]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, sig: Sequence[int]):
+        for b in range(self.bands):
+            yield b, tuple(sig[b * self.rows : (b + 1) * self.rows])
+
+    def query(self, sig: Sequence[int]) -> List[Any]:
+        found: List[Any] = []
+        seen = set()
+        for b, key in self._band_keys(sig):
+            for item in self._buckets[b].get(key, ()):
+                if item not in seen:
+                    seen.add(item)
+                    found.append(item)
+        return found
+
+    def insert(self, key: Any, sig: Sequence[int]) -> None:
+        for b, band in self._band_keys(sig):
+            self._buckets[b].setdefault(band, []).append(key)
+
+
+def _snippet_text(item: Dict[str, Any]) -> str:
+    return " ".join(str(item.get(k) or "") for k in ("title", "content"))
+
+
+def dedup_snippets(
+    groups: Dict[str, List[Dict[str, Any]]],
+    threshold: Optional[float] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], DedupStats]:
+    """Drop exact-URL and near-duplicate snippets across aspect groups.
+
+    ``groups`` maps aspect -> list of provider result dicts. The first occurrence
+    (in aspect order, then provider rank) wins. Returns the filtered groups and
+    a :class:`DedupStats` summary.
+    """
+    threshold = config.dedup_similarity_threshold if threshold is None else threshold
+    hasher = MinHasher()
+    lsh = MinHashLSH(hasher.num_perm)
+    signatures: Dict[int, Tuple[int, ...]] = {}
+    seen_urls: Set[str] = set()
+    stats = DedupStats()
+    kept_groups: Dict[str, List[Dict[str, Any]]] = {}
+    for aspect, items in groups.items():
+        kept: List[Dict[str, Any]] = []
+        for item in items:
+            stats.total += 1
+            if not isinstance(item, dict):
+                kept.append(item)
+                continue
+            url = canonicalize_url(str(item.get("url") or ""))
+            if url and url in seen_urls:
+                stats.url_duplicates += 1
+                continue
+            grams = shingles(_snippet_text(item))
+            if not grams:
+                if url:
+                    seen_urls.add(url)
+                kept.append(item)
+                continue
+            sig = hasher.signature(grams)
+            if any(hasher.similarity(sig, signatures[k]) >= threshold for k in lsh.query(sig)):
+                stats.near_duplicates += 1
+                continue
+            if url:
+                seen_urls.add(url)
+            key = len(signatures)
+            signatures[key] = sig
+            lsh.insert(key, sig)
+            kept.append(item)
+        kept_groups[aspect] = kept
+    return kept_groups, stats
@@ -1,14 +1,88 @@
-from typing import Dict
+import io
+import json
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterable, Optional, Tuple
 from .config import config
+from .models import CRMData
 
-def format_comparison_table(comparison: Dict) -> str:
+TABLE_HEADER = (
+    "| CRM | Pricing | Features | Integrations | Overall | Best For |\n"
+    "|-----|---------|----------|-------------|---------|----------|\n"
+)
+
+def format_table_row(crm: str, s: Dict[str, float], detail) -> str:
+    best_for = ", ".join(detail.get("best_for", [])[:2]) if isinstance(detail, dict) else ""
+    return f"| {crm} | {s['pricing']:.2f} | {s['features']:.2f} | {s['integrations']:.2f} | {s['overall']:.2f} | {best_for} |\n"
+
+def _ordered_crms(scores: Dict, sort_by: Optional[str]) -> Iterable[str]:
+    if sort_by:
+        return sorted(scores, key=lambda c: scores[c].get(sort_by, 0), reverse=True)
+    return [crm for crm in config.crms if crm in scores]
+
+def write_comparison_table(comparison: Dict, out: IO[str], sort_by: Optional[str] = None) -> None:
+    """Stream the Markdown table to ``out`` (config.crms order, or descending by a score key)."""
     scores = comparison.get("scores", {})
     data = comparison.get("detailed_data", {})
-    table = "| CRM | Pricing | Features | Integrations | Overall | Best For |\n"
-    table += "|-----|---------|----------|-------------|---------|----------|\n"
-    for crm in config.crms:
-        if crm in scores:
-            s = scores[crm]
-            best_for = ", ".join(data.get(crm, {}).get("best_for", [])[:2]) if isinstance(data.get(crm), dict) else ""
-            table += f"| {crm} | {s['pricing']:.2f} | {s['features']:.2f} | {s['integrations']:.2f} | {s['overall']:.2f} | {best_for} |\n"
-    return table
+    out.write(TABLE_HEADER)
+    for crm in _ordered_crms(scores, sort_by):
+        out.write(format_table_row(crm, scores[crm], data.get(crm)))
+
+def format_comparison_table(comparison: Dict, sort_by: Optional[str] = None) -> str:
+    buf = io.StringIO()
+    write_comparison_table(comparison, buf, sort_by)
+    return buf.getvalue()
+
+
+class IncrementalReportWriter:
+    """Emit table rows and NDJSON records per CRM as soon as its data is available.
+
+    ``update`` is called with the current ``crm_data`` after each graph step; CRMs
+    that are new or were re-researched (a different object) get scored with
+    ``score_fn`` (e.g. ``AnalysisAgent.calculate_scores``) and written to both
+    streams immediately. ``write_final`` renders the sorted view once the run ends.
+    """
+    def __init__(self, table_out: IO[str], ndjson_path: Optional[Path] = None,
+                 score_fn: Optional[Callable[[Dict[str, CRMData]], Dict[str, Dict[str, float]]]] = None):
+        self.table_out = table_out
+        self.ndjson = open(ndjson_path, "w", encoding="utf-8", buffering=1 << 16) if ndjson_path else None
+        self.score_fn = score_fn
+        self._seen: Dict[str, CRMData] = {}
+        self._header_written = False
+        self.step = 0
+
+    def _changed(self, crm_data: Dict[str, CRMData]) -> Iterable[Tuple[str, CRMData]]:
+        for crm, data in crm_data.items():
+            if isinstance(data, CRMData) and self._seen.get(crm) is not data:
+                yield crm, data
+
+    def update(self, crm_data: Dict[str, CRMData]) -> int:
+        self.step += 1
+        changed = dict(self._changed(crm_data))
+        if not changed:
+            return 0
+        scores = self.score_fn(changed) if self.score_fn else {}
+        if not self._header_written and scores:
+            self.table_out.write(TABLE_HEADER)
+            self._header_written = True
+        for crm, data in changed.items():
+            revision = "update" if crm in self._seen else "new"
+            self._seen[crm] = data
+            detail = data.model_dump()
+            if crm in scores:
+                self.table_out.write(format_table_row(crm, scores[crm], detail))
+            if self.ndjson:
+                record = {"crm": crm, "step": self.step, "revision": revision, "scores": scores.get(crm), "data": detail}
+                self.ndjson.write(json.dumps(record) + "\n")
+        self.table_out.flush()
+        if self.ndjson:
+            self.ndjson.flush()
+        return len(changed)
+
+    def write_final(self, comparison: Dict, sort_by: str = "overall") -> None:
+        write_comparison_table(comparison, self.table_out, sort_by)
+        self.table_out.flush()
+
+    def close(self) -> None:
+        if self.ndjson:
+            self.ndjson.close()
+            self.ndjson = None
@@ -0,0 +1,298 @@
+"""Append-only columnar history of comparison results.
+
+One row per (run, CRM). Each column is a flat binary file of fixed-width native
+values (``array`` typecodes) under ``config.history_dir``; CRM names and run
+trace ids are dictionary-encoded in small JSON-lines side files. Reads
+memory-map only the columns a query needs, so trend and top-k queries over
+hundreds of runs never parse report JSON.
+
+    python -m crm_agent_system.history series Zoho min_price --last 200
+    python -m crm_agent_system.history top overall --k 5
+    python -m crm_agent_system.history ingest output/crm_report_*.json
+"""
+import argparse
+import json
+import logging
+import math
+import mmap
+import sys
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import config
+from .utils import locked_file
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# column -> array typecode
+COLUMNS: Dict[str, str] = {
+    "run_id": "i",
+    "crm_id": "i",
+    "ts": "d",
+    "pricing": "d",
+    "features": "d",
+    "integrations": "d",
+    "overall": "d",
+    "min_price": "d",
+    "tier_count": "i",
+    "integration_count": "i",
+    "confidence": "d",
+}
+METRICS = [c for c in COLUMNS if c not in ("run_id", "crm_id", "ts")]
+
+
+class _Dictionary:
+    """Append-only string <-> id mapping stored as JSON lines."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.reload()
+
+    def reload(self) -> None:
+        """Re-read the file (other processes may have added entries)."""
+        self.values: List[str] = []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.values = [json.loads(line) for line in f if line.strip()]
+        self.ids = {v: i for i, v in enumerate(self.values)}
+
+    def get(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def add(self, value: str) -> int:
+        if value in self.ids:
+            return self.ids[value]
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(value) + "\n")
+        self.ids[value] = len(self.values)
+        self.values.append(value)
+        return self.ids[value]
+
+
+def _row_from_comparison(crm: str, scores: Dict[str, float], detail: Dict[str, Any]) -> Dict[str, float]:
+    tiers = detail.get("pricing_tiers") or []
+    prices = [t.get("monthly_price") for t in tiers if isinstance(t, dict) and t.get("monthly_price") is not None]
+    return {
+        "pricing": scores.get("pricing", math.nan),
+        "features": scores.get("features", math.nan),
+        "integrations": scores.get("integrations", math.nan),
+        "overall": scores.get("overall", math.nan),
+        "min_price": min(prices) if prices else math.nan,
+        "tier_count": len(tiers),
+        "integration_count": len(detail.get("integrations") or []),
+        "confidence": detail.get("confidence_score", math.nan),
+    }
+
+
+class HistoryStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or config.history_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path = self.root / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") != FORMAT_VERSION or meta.get("byteorder") != sys.byteorder:
+                raise ValueError(f"{self.root}: incompatible history store {meta}")
+        else:
+            meta_path.write_text(json.dumps({"version": FORMAT_VERSION, "byteorder": sys.byteorder, "columns": COLUMNS}), encoding="utf-8")
+        # Runs before CRMs: every CRM referenced by a loaded run is then loaded too
+        self.runs = _Dictionary(self.root / "runs.jsonl")
+        self.crms = _Dictionary(self.root / "crms.jsonl")
+
+    def _col_path(self, name: str) -> Path:
+        return self.root / f"{name}.col"
+
+    # ------------------------------------------------------------------ writes
+    def _repair(self) -> None:
+        """Drop a partially appended batch left by a crash mid-append.
+
+        Columns are truncated to their shared row count, then trailing rows of a run
+        whose trace id was never registered (runs are registered after their columns).
+        """
+        sizes = {}
+        for name, code in COLUMNS.items():
+            path = self._col_path(name)
+            sizes[name] = (path.stat().st_size if path.exists() else 0) // array(code).itemsize
+        rows = min(sizes.values())
+        if rows:
+            run_col = array(COLUMNS["run_id"])
+            with open(self._col_path("run_id"), "rb") as f:
+                run_col.fromfile(f, rows)
+            while rows and run_col[rows - 1] >= len(self.runs.values):
+                rows -= 1
+        for name, n in sizes.items():
+            if n != rows:
+                with open(self._col_path(name), "r+b") as f:
+                    f.truncate(rows * array(COLUMNS[name]).itemsize)
+
+    def append_run(self, trace_id: str, comparison: Dict[str, Any], timestamp: Optional[float] = None) -> int:
+        """Append one row per scored CRM of a ``final_comparison``. Returns rows written.
+
+        Serialized across processes by a lock on ``meta.json``: ids are assigned from
+        freshly reloaded dictionaries and all columns are written under that lock.
+        """
+        scores = comparison.get("scores") or {}
+        detailed = comparison.get("detailed_data") or {}
+        if not scores:
+            return 0
+        if timestamp is None:
+            ts = comparison.get("timestamp")
+            timestamp = datetime.fromisoformat(ts).timestamp() if ts else datetime.now().timestamp()
+        with locked_file(self.root / "meta.json"):
+            self.crms.reload()
+            self.runs.reload()
+            self._repair()
+            run_id = self.runs.get(trace_id)
+            if run_id is None:
+                run_id = len(self.runs.values)
+            cols: Dict[str, array] = {name: array(code) for name, code in COLUMNS.items()}
+            for crm, s in scores.items():
+                row = _row_from_comparison(crm, s, detailed.get(crm) or {})
+                row.update(run_id=run_id, crm_id=self.crms.add(crm), ts=timestamp)
+                for name, values in cols.items():
+                    values.append(row[name])
+            # Key columns last: a crash mid-append leaves rows that readers ignore (row count = shortest column)
+            for name in [c for c in COLUMNS if c not in ("run_id", "crm_id")] + ["crm_id", "run_id"]:
+                with open(self._col_path(name), "ab") as f:
+                    cols[name].tofile(f)
+            # Registered last, so a crashed append is dropped by _repair instead of being skipped as recorded
+            self.runs.add(trace_id)
+        return len(scores)
+
+    # ------------------------------------------------------------------- reads
+    def _mapped(self, names: Iterable[str]) -> Tuple[Dict[str, memoryview], List[mmap.mmap]]:
+        views: Dict[str, memoryview] = {}
+        maps: List[mmap.mmap] = []
+        for name in names:
+            path = self._col_path(name)
+            code = COLUMNS[name]
+            if not path.exists() or path.stat().st_size == 0:
+                views[name] = memoryview(array(code))
+                continue
+            with open(path, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            maps.append(m)
+            itemsize = array(code).itemsize
+            usable = len(m) - len(m) % itemsize
+            views[name] = memoryview(m)[:usable].cast(code)
+        return views, maps
+
+    def _read(self, names: Iterable[str]):
+        names = list(dict.fromkeys(names))
+        views, maps = self._mapped(names)
+        rows = min((len(v) for v in views.values()), default=0)
+        if "run_id" in views:
+            # Skip trailing rows of runs not in this store's snapshot (appended later, or still being appended)
+            while rows and views["run_id"][rows - 1] >= len(self.runs.values):
+                rows -= 1
+        return views, maps, rows
+
+    @staticmethod
+    def _release(views: Dict[str, memoryview], maps: List[mmap.mmap]) -> None:
+        for v in views.values():
+            v.release()
+        for m in maps:
+            m.close()
+
+    def time_series(self, crm: str, metric: str, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """``[{run, ts, value}]`` for one CRM, oldest first (optionally only the newest ``last`` points)."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; choose from {METRICS}")
+        crm_id = self.crms.get(crm)
+        if crm_id is None:
+            return []
+        views, maps, rows = self._read(["crm_id", "run_id", "ts", metric])
+        try:
+            crm_col = views["crm_id"]
+            idx = [i for i in range(rows) if crm_col[i] == crm_id]
+            if last:
+                idx = idx[-last:]
+            return [
+                {"run": self.runs.values[views["run_id"][i]], "ts": views["ts"][i], "value": views[metric][i]}
+                for i in idx
+            ]
+        finally:
+            self._release(views, maps)
+
+    def top_k(self, metric: str, k: int = 5, run: Optional[str] = None, ascending: bool = False) -> List[Dict[str, Any]]:
+        """Top ``k`` CRMs by ``metric`` within one run (default: most recent run). NaN values are skipped."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; choose from {METRICS}")
+        if not self.runs.values:
+            return []
+        run_id = self.runs.get(run) if run else len(self.runs.values) - 1
+        if run_id is None:
+            return []
+        views, maps, rows = self._read(["run_id", "crm_id", metric])
+        try:
+            run_col, values = views["run_id"], views[metric]
+            picked = [(values[i], views["crm_id"][i]) for i in range(rows) if run_col[i] == run_id and not math.isnan(values[i])]
+        finally:
+            self._release(views, maps)
+        picked.sort(key=lambda p: p[0], reverse=not ascending)
+        return [{"crm": self.crms.values[c], "value": v} for v, c in picked[:k]]
+
+
+def record_comparison(trace_id: str, comparison: Dict[str, Any]) -> int:
+    """Append a finished run's comparison to the default history store.
+
+    A trace id already in the store (e.g. a reused ``--trace-id``) is skipped, as in ``ingest``.
+    """
+    store = HistoryStore()
+    if store.runs.get(trace_id) is not None:
+        logger.warning("History already has run %s; not recording it again", trace_id)
+        return 0
+    return store.append_run(trace_id, comparison)
+
+
+def _json_safe(value: Any) -> Any:
+    """NaN (missing metric) -> None, so CLI output is valid JSON (``null``)."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Query the columnar CRM comparison history")
+    parser.add_argument("--dir", help="History store directory (default config.history_dir)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_series = sub.add_parser("series", help="Time series of one metric for one CRM")
+    p_series.add_argument("crm")
+    p_series.add_argument("metric", choices=METRICS)
+    p_series.add_argument("--last", type=int)
+    p_top = sub.add_parser("top", help="Top-k CRMs by a metric within a run")
+    p_top.add_argument("metric", choices=METRICS)
+    p_top.add_argument("--k", type=int, default=5)
+    p_top.add_argument("--run", help="Trace id (default: latest run)")
+    p_top.add_argument("--ascending", action="store_true", help="Lowest first (e.g. min_price)")
+    p_ingest = sub.add_parser("ingest", help="Backfill from crm_report_<trace>.json files")
+    p_ingest.add_argument("reports", nargs="+")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.dir)
+    if args.cmd == "series":
+        result: Any = store.time_series(args.crm, args.metric, args.last)
+    elif args.cmd == "top":
+        result = store.top_k(args.metric, args.k, args.run, args.ascending)
+    else:
+        result = {}
+        for report in sorted(args.reports):
+            path = Path(report)
+            trace_id = path.stem.replace("crm_report_", "", 1)
+            if store.runs.get(trace_id) is not None:
+                result[trace_id] = "skipped (already ingested)"
+                continue
+            result[trace_id] = store.append_run(trace_id, json.loads(path.read_text(encoding="utf-8")))
+    print(json.dumps(_json_safe(result), indent=2, allow_nan=False))
+
+
+if __name__ == "__main__":
+    main()
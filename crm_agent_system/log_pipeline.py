@@ -0,0 +1,114 @@
+"""Non-blocking logging pipeline.
+
+Records are enqueued by a ``QueueHandler`` on the root logger and written by a
+``QueueListener`` background thread, so console/file I/O never runs inside the
+event loop. High-volume DEBUG events are sampled/rate limited before they are
+enqueued.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+from .config import config
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Rate limit + sample DEBUG records per call site (source file, line).
+
+    Keying on the call site rather than the message keeps f-string messages in one
+    bucket. Each call site gets ``rate_per_sec`` records per second (token bucket, burst of
+    the same size); beyond that only every ``sample_every``-th record passes.
+    Records above DEBUG are never dropped. At most ``max_keys`` buckets are kept
+    (least recently used evicted).
+    """
+
+    def __init__(self, rate_per_sec: Optional[float] = None, sample_every: Optional[int] = None,
+                 max_keys: Optional[int] = None):
+        super().__init__()
+        self.rate = config.log_debug_rate_per_sec if rate_per_sec is None else rate_per_sec
+        self.sample_every = max(1, config.log_debug_sample_every if sample_every is None else sample_every)
+        self.max_keys = max(1, config.log_debug_max_keys if max_keys is None else max_keys)
+        self._buckets: "OrderedDict[Tuple[str, int], list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [tokens, last_refill, overflow_count]
+                bucket = self._buckets[key] = [self.rate, now, 0]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            bucket[2] += 1
+            if bucket[2] % self.sample_every == 0:
+                return True
+            self.dropped += 1
+            return False
+
+
+def start_log_listener(handlers: Iterable[logging.Handler], sample_debug: bool = True) -> logging.handlers.QueueListener:
+    """Route root logging through a queue drained by a background listener.
+
+    Replaces any listener started previously in this process.
+    """
+    global _listener, _queue_handler
+    stop_log_listener()
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    qh = logging.handlers.QueueHandler(log_queue)
+    qh.setLevel(logging.DEBUG)
+    if sample_debug:
+        qh.addFilter(DebugSamplingFilter())
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logging.getLogger().addHandler(qh)
+    _listener, _queue_handler = listener, qh
+    return listener
+
+
+def stop_log_listener() -> None:
+    """Flush queued records, stop the listener thread and close its handlers."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
@@ -2,23 +2,35 @@ import asyncio
 import argparse
 import json
 import logging
+import sys
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from langchain_core.messages import HumanMessage
 from .config import config
-from .workflow import create_agent_graph
-from .formatters import format_comparison_table
-from .models import AgentState
+from .workflow import create_agent_graph, model_router
+from .formatters import IncrementalReportWriter, format_comparison_table
+from .agents import AnalysisAgent
+from .models import AgentState, CRMData
+from .serialization import save_records
+from .history import record_comparison
+from .query_plan import flush_query_plan_stats
+from .search_depth import flush_depth_history
+from .profiling import PROFILE_MODES, Profiler
+from .log_pipeline import JsonLinesFormatter, start_log_listener, stop_log_listener
 
 
-def _configure_logging(trace_id: str, level: str):
+def _configure_logging(trace_id: str, level: str, json_lines: bool = False):
     """Configure console + file logging for a run.
 
-    Creates output/crm_run_<trace_id>.log capturing DEBUG+ while console uses chosen level.
+    Creates output/crm_run_<trace_id>.log (or .jsonl with ``json_lines``) capturing DEBUG+
+    while console uses chosen level. Records are handed to a background
+    ``QueueListener`` so writes never block the event loop; noisy DEBUG events are
+    sampled (see ``log_pipeline.DebugSamplingFilter``).
     Safe to call multiple times (idempotent per trace id)."""
     log_dir = Path("output")
     log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / f"crm_run_{trace_id}.log"
+    log_file = log_dir / f"crm_run_{trace_id}.{'jsonl' if json_lines else 'log'}"
 
     root = logging.getLogger()
     # Avoid duplicating handlers if re-run inside same process
@@ -28,28 +40,44 @@ def _configure_logging(trace_id: str, level: str):
             root.removeHandler(h)
 
     root.setLevel(logging.DEBUG)
+    handlers = []
     # Console handler
-    if not any(isinstance(h, logging.StreamHandler) for h in root.handlers):
+    if not any(type(h) is logging.StreamHandler for h in root.handlers):
         ch = logging.StreamHandler()
         ch.setLevel(getattr(logging, level.upper(), logging.INFO))
         ch.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
-        root.addHandler(ch)
+        handlers.append(ch)
     # File handler (always debug for full detail)
     fh = logging.FileHandler(log_file, mode="a", encoding="utf-8")
     fh.setLevel(logging.DEBUG)
-    fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
-    root.addHandler(fh)
+    if json_lines:
+        fh.setFormatter(JsonLinesFormatter())
+    else:
+        fh.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+    handlers.append(fh)
+    start_log_listener(handlers, sample_debug=config.log_debug_sampling)
     logging.getLogger(__name__).info("Logging to %s (level=%s)", log_file, level.upper())
 
-async def run(trace_id: str | None = None, log_level: str = "INFO"):
+async def run(trace_id: str | None = None, log_level: str = "INFO", log_json: bool = False, profile: str | None = None):
     trace_id = trace_id or datetime.now().strftime("%Y%m%d_%H%M%S")
-    _configure_logging(trace_id, log_level)
+    _configure_logging(trace_id, log_level, json_lines=log_json or config.log_json)
     print("🚀 Starting Enhanced Multi-Agent CRM Research System")
+    with Profiler(trace_id, profile) if profile else nullcontext():
+        try:
+            return await _execute(trace_id)
+        finally:
+            # Learned search stats are merged into their files once per run, off the event loop
+            await asyncio.to_thread(flush_depth_history)
+            await asyncio.to_thread(flush_query_plan_stats)
+
+async def _execute(trace_id: str):
     app = create_agent_graph()
     initial_state: AgentState = {
         "messages": [HumanMessage(content=f"Compare {', '.join(config.crms)} focusing on {', '.join(config.aspects)} for small B2B.")],
         "crm_data": {},
         "research_status": {},
+        "research_attempts": {},
+        "precheck_retry": [],
         "validation_results": [],
         "final_comparison": {},
         "current_task": "",
@@ -58,16 +86,43 @@ async def run(trace_id: str | None = None, log_level: str = "INFO"):
         "convergence_history": [],
         "trace_id": trace_id,
     }
-    final_state = await app.ainvoke(initial_state)
+    out_dir = Path("output"); out_dir.mkdir(exist_ok=True)
+    if config.stream_report:
+        # Emit rows / NDJSON records per CRM as research lands instead of after the whole graph:
+        # the research node pushes each CRM on the "custom" stream as soon as it finishes
+        print("\n📡 PARTIAL RESULTS (streaming):")
+        writer = IncrementalReportWriter(
+            sys.stdout, out_dir / f"crm_stream_{trace_id}.ndjson", AnalysisAgent(llm=None).calculate_scores
+        )
+        final_state = initial_state
+        try:
+            async for mode, chunk in app.astream(initial_state, stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    writer.update({chunk["crm"]: chunk["data"]})
+                else:
+                    final_state = chunk
+                    writer.update(chunk.get("crm_data", {}))
+        finally:
+            writer.close()
+    else:
+        final_state = await app.ainvoke(initial_state)
     comparison = final_state.get("final_comparison", {})
     if comparison:
         print("\n📊 COMPARISON TABLE:")
-        print(format_comparison_table(comparison))
+        if config.stream_report:
+            writer.write_final(comparison, sort_by="overall")
+        else:
+            print(format_comparison_table(comparison))
         print("\n📌 SUMMARY:")
         print(comparison.get("summary", ""))
-        out_dir = Path("output"); out_dir.mkdir(exist_ok=True)
         with open(out_dir / f"crm_report_{trace_id}.json", "w") as f:
             json.dump(comparison, f, indent=2)
+        crm_data = {k: v for k, v in final_state.get("crm_data", {}).items() if isinstance(v, CRMData)}
+        if crm_data:
+            save_records(out_dir / f"crm_records_{trace_id}.jsonl", crm_data.values())
+        if config.history_enabled:
+            record_comparison(trace_id, comparison)
+    logging.getLogger(__name__).info("Model usage: %s", model_router.summary())
     return final_state
 
 if __name__ == "__main__":
@@ -78,9 +133,17 @@ if __name__ == "__main__":
     parser.add_argument("--model")
     parser.add_argument("--trace-id")
     parser.add_argument("--log-level", default="INFO", help="Console log level (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument("--log-json", action="store_true", help="Write the run log as JSON lines")
+    parser.add_argument("--no-stream", action="store_true", help="Print results only after the whole graph finishes")
+    parser.add_argument("--profile", nargs="?", const="sample", choices=PROFILE_MODES,
+                        help="Profile the run (default: sample) into output/profiles/<trace_id>/")
     args = parser.parse_args()
     if args.crms: config.crms = args.crms
     if args.aspects: config.aspects = args.aspects
     if args.max_iterations: config.max_iterations = args.max_iterations
     if args.model: config.llm_model = args.model
-    asyncio.run(run(args.trace_id, args.log_level))
+    if args.no_stream: config.stream_report = False
+    try:
+        asyncio.run(run(args.trace_id, args.log_level, args.log_json, args.profile))
+    finally:
+        stop_log_listener()
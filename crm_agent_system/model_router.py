@@ -0,0 +1,163 @@
+"""Per-task LLM routing with escalation.
+
+Each task (``extraction``, ``summary``, ``reask``) resolves to a model from
+``config.llm_task_models`` (empty = ``config.llm_model``). Extraction runs on the
+fast model first and is re-asked on the ``reask`` model only when the output
+fails the ``CRMData`` parse or its confidence heuristic stays below
+``config.model_escalation_confidence``.
+
+``StubChatModel`` is a deterministic offline chat model (``llm_provider = "stub"``)
+so the routing and extraction paths run without API keys.
+"""
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+TASKS = ("extraction", "summary", "reask")
+
+
+class ModelRouter:
+    """Maps tasks to models and caches one client per model name."""
+
+    def __init__(self, factory: Callable[[str], Any], task_models: Optional[Dict[str, str]] = None):
+        self.factory = factory
+        self.task_models = task_models
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.usage: Counter = Counter()
+        self.escalations: Counter = Counter()
+
+    def model_for(self, task: str) -> str:
+        if task not in TASKS:
+            raise ValueError(f"Unknown task {task!r}; choose from {TASKS}")
+        if not config.model_routing:
+            return config.llm_model
+        models = self.task_models if self.task_models is not None else config.llm_task_models
+        return models.get(task) or config.llm_model
+
+    def client(self, model: str) -> Any:
+        with self._lock:
+            if model not in self._clients:
+                self._clients[model] = self.factory(model)
+            return self._clients[model]
+
+    def llm(self, task: str) -> Any:
+        return self.client(self.model_for(task))
+
+    def escalation_chain(self, task: str = "extraction") -> List[str]:
+        """Models to try in order: the task's model, then the re-ask model if it differs."""
+        chain = [self.model_for(task)]
+        reask = self.model_for("reask")
+        if reask not in chain:
+            chain.append(reask)
+        return chain
+
+    def record(self, model: str, escalated_from: Optional[str] = None) -> None:
+        self.usage[model] += 1
+        if escalated_from:
+            self.escalations[f"{escalated_from}->{model}"] += 1
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {"calls": dict(self.usage), "escalations": dict(self.escalations)}
+
+
+class _Routed:
+    """Chat model facade that counts calls against the router (used for single-model tasks)."""
+
+    def __init__(self, router: ModelRouter, task: str):
+        self.router = router
+        self.task = task
+
+    async def ainvoke(self, *args, **kwargs):
+        model = self.router.model_for(self.task)
+        self.router.record(model)
+        return await self.router.client(model).ainvoke(*args, **kwargs)
+
+
+def routed_llm(router: ModelRouter, task: str) -> Any:
+    """An ``ainvoke``-able model for ``task`` that resolves the configured model per call."""
+    return _Routed(router, task)
+
+
+# --------------------------------------------------------------------- stub model
+_PRICE_RE = re.compile(r"\b([A-Z][A-Za-z]+):\s*(?:\$(\d+(?:\.\d+)?)|free)", re.IGNORECASE)
+_FEATURES_RE = re.compile(r"features?:\s*([^.]+)", re.IGNORECASE)
+_LIMITATION_CUES = ("limit", "expensive", "lack", "steep", "complex", "no ", "only ", "requires")
+
+
+def _snippet_texts(raw: str) -> List[str]:
+    """Contents of the ``RAW_SNIPPETS`` payload (a JSON list of per-aspect JSON result lists)."""
+    texts: List[str] = []
+    try:
+        blocks = json.loads(raw)
+    except ValueError:
+        return [raw]
+    for block in blocks if isinstance(blocks, list) else [blocks]:
+        try:
+            items = json.loads(block) if isinstance(block, str) else block
+        except ValueError:
+            texts.append(str(block))
+            continue
+        for item in items if isinstance(items, list) else [items]:
+            if isinstance(item, dict):
+                texts.append(f"{item.get('title', '')}: {item.get('content', '')}")
+    return texts
+
+
+class StubChatModel:
+    """Deterministic offline chat model.
+
+    Extraction prompts (containing ``RAW_SNIPPETS:``) get a ``CRMData`` JSON object
+    built with simple patterns over the snippets; anything else gets a short summary.
+    ``broken=True`` answers extraction prompts with prose, to exercise escalation.
+    """
+
+    def __init__(self, model: str = "stub", broken: bool = False):
+        self.model = model
+        self.broken = broken
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            m["content"] if isinstance(m, dict) else getattr(m, "content", str(m)) for m in messages
+        )
+        if "RAW_SNIPPETS:" not in prompt:
+            return AIMessage(content=f"[{self.model}] Offline summary: scores and data above are the basis for this comparison.")
+        if self.broken:
+            return AIMessage(content="I could not find enough information to produce the requested JSON.")
+        return AIMessage(content=json.dumps(self._extract(prompt)))
+
+    def _extract(self, prompt: str) -> Dict[str, Any]:
+        from .agents.research import INTEGRATION_KEYWORDS
+
+        name = re.search(r"CRM '([^']+)'", prompt)
+        raw = prompt.split("RAW_SNIPPETS:", 1)[1].split("\n", 1)[0].strip()
+        texts = _snippet_texts(raw)
+        joined = " ".join(texts)
+        tiers: Dict[str, Optional[float]] = {}
+        for tier, price in _PRICE_RE.findall(joined):
+            tiers.setdefault(tier, float(price) if price else 0.0)
+        features: List[str] = []
+        for match in _FEATURES_RE.findall(joined):
+            features.extend(f.strip() for f in match.split(",") if f.strip())
+        limitations = [
+            s.strip() for t in texts for s in t.split(".")
+            if s.strip() and any(cue in s.lower() for cue in _LIMITATION_CUES)
+        ]
+        return {
+            "name": name.group(1) if name else "unknown",
+            "pricing_tiers": [{"name": t, "monthly_price": p} for t, p in tiers.items()],
+            "features": {"core_features": list(dict.fromkeys(features))[:12]},
+            "integrations": [{"name": kw, "category": "third-party"} for kw in INTEGRATION_KEYWORDS if kw in joined],
+            "limitations": list(dict.fromkeys(limitations))[:6],
+            "best_for": ["SMB"],
+            "confidence_score": 0.5,
+        }
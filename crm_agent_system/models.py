@@ -1,3 +1,4 @@
+from enum import IntFlag
 from typing import List, Optional, Dict, Any, Annotated
 from pydantic import BaseModel, Field
 from langgraph.graph.message import add_messages
@@ -30,14 +31,36 @@ class CRMData(BaseModel):
     best_for: List[str] = Field(default_factory=list)
     confidence_score: float = Field(0.0, ge=0.0, le=1.0)
 
+class Completeness(IntFlag):
+    """Compact per-CRM completeness status (one bit per required section)."""
+    NONE = 0
+    PRICING = 1
+    FEATURES = 2
+    INTEGRATIONS = 4
+    LIMITATIONS = 8
+    ALL = PRICING | FEATURES | INTEGRATIONS | LIMITATIONS
+
+def compact_report(report: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Reduce a completeness report ({crm: {score, issues, complete, mask}}) to {crm: Completeness mask}."""
+    return {crm: int(entry["mask"]) for crm, entry in report.items()}
+
+def completeness_score(mask: int) -> float:
+    """Fraction (0..1) of required sections present in a Completeness mask."""
+    return bin(int(mask) & Completeness.ALL).count("1") / 4
+
 class AgentState(TypedDict):
     messages: Annotated[List, add_messages]
     crm_data: Dict[str, CRMData]
     research_status: Dict[str, bool]
-    validation_results: List[Dict[str, Any]]
+    research_attempts: Dict[str, int]
+    # CRMs sent back to research by the pre-analysis completeness gate
+    precheck_retry: List[str]
+    # Compact completeness masks per validate pass, newest last (bounded by config.validation_history_limit)
+    validation_results: List[Dict[str, int]]
     final_comparison: Dict[str, Any]
     current_task: str
     iteration_count: int
+    # Ring buffer bounded by config.error_log_limit
     error_log: List[Dict[str, Any]]
     convergence_history: List[str]
     trace_id: str
@@ -0,0 +1,333 @@
+"""Run profiling: sampled / deterministic CPU profiles and asyncio task timelines.
+
+``Profiler`` wraps a run and writes, per ``trace_id`` under ``config.profile_dir``:
+- ``collapsed.txt``: folded stacks (``frame;frame;leaf count``) from a sampling
+  thread, for flamegraph.pl / speedscope.
+- ``top.txt`` / ``top.json``: top-N functions by self and inclusive CPU samples
+  (``sample`` mode) or by cProfile tottime / cumtime (``cprofile`` mode, which
+  also saves ``profile.pstats``).
+- ``timeline.json``: one Chrome trace event per asyncio task (chrome://tracing, Perfetto).
+
+Samples whose innermost frame is the event loop waiting in ``selectors`` are
+counted as idle (I/O wait) and excluded from the CPU tables (in ``cprofile`` mode
+the selector and ``select.*`` poll entries are dropped likewise).
+
+    python -m crm_agent_system.profiling top run001
+    python -m crm_agent_system.profiling compare run001 run002
+"""
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import math
+import os
+import pstats
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+
+_IDLE_FRAMES = {("selectors", "select"), ("selectors", "_select")}
+# Frames on every stack (interpreter / event loop plumbing) are left out of the inclusive table
+_SCAFFOLDING = ("asyncio/", "<frozen ", "runpy.py:", "threading.py:", "contextlib.py:", "crm_agent_system/profiling.py:")
+
+
+_STDLIB = Path(sysconfig.get_paths()["stdlib"])
+
+
+def _label(filename: str, name: str) -> str:
+    """``path:function`` with paths shortened to the package / stdlib-relative form."""
+    path = Path(filename)
+    parts = path.parts
+    if "site-packages" in parts:
+        short = "/".join(parts[len(parts) - parts[::-1].index("site-packages"):])
+    elif "crm_agent_system" in parts or "demo" in parts:
+        anchor = "crm_agent_system" if "crm_agent_system" in parts else "demo"
+        short = "/".join(parts[len(parts) - 1 - parts[::-1].index(anchor):])
+    elif path.is_relative_to(_STDLIB):
+        short = path.relative_to(_STDLIB).as_posix()
+    else:
+        short = path.name or filename
+    return f"{short}:{name}"
+
+
+def _frame_label(code) -> str:
+    return _label(code.co_filename, getattr(code, "co_qualname", code.co_name))
+
+
+def _is_idle(code) -> bool:
+    return (Path(code.co_filename).stem, code.co_name) in _IDLE_FRAMES
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every ``interval`` seconds into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="crm-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.idle = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if _is_idle(frame.f_code):
+                self.idle += 1
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class TaskTimeline:
+    """Records create / done times of every asyncio task created on a loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.t0 = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._previous = loop.get_task_factory()
+        loop.set_task_factory(self._factory)
+
+    def _factory(self, loop, coro, **kwargs):
+        task = self._previous(loop, coro, **kwargs) if self._previous else asyncio.Task(coro, loop=loop, **kwargs)
+        start = time.perf_counter()
+        name = getattr(coro, "__qualname__", type(coro).__name__)
+
+        def done(t: asyncio.Task) -> None:
+            self.events.append({
+                "name": name,
+                "cat": "task",
+                "ph": "X",
+                "ts": round((start - self.t0) * 1e6),
+                "dur": round((time.perf_counter() - start) * 1e6),
+                "pid": os.getpid(),
+                "tid": t.get_name(),
+                "args": {"cancelled": t.cancelled(), "error": None if t.cancelled() or not t.exception() else repr(t.exception())},
+            })
+
+        task.add_done_callback(done)
+        return task
+
+    def close(self) -> None:
+        self.loop.set_task_factory(self._previous)
+
+
+class Profiler:
+    """Context manager profiling the enclosed run; reports land in ``<profile_dir>/<trace_id>/``."""
+
+    def __init__(self, trace_id: str, mode: str = "sample", out_dir: Optional[str] = None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; choose from {PROFILE_MODES}")
+        self.trace_id = trace_id
+        self.mode = mode
+        self.out_dir = Path(out_dir or config.profile_dir) / trace_id
+        self._sampler: Optional[StackSampler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._timeline: Optional[TaskTimeline] = None
+
+    def __enter__(self) -> "Profiler":
+        try:
+            self._timeline = TaskTimeline(asyncio.get_running_loop())
+        except RuntimeError:  # not inside a loop: CPU profile only
+            self._timeline = None
+        self._sampler = StackSampler(threading.get_ident(), config.profile_interval)
+        # A busy loop thread only releases the GIL every switch interval (5ms default); shorten it
+        # so the sampler actually wakes at profile_interval
+        self._switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch, config.profile_interval / 5))
+        self._wall0, self._cpu0 = time.perf_counter(), time.process_time()
+        self._sampler.start()
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._cprofile:
+            self._cprofile.disable()
+        self._sampler.stop()
+        sys.setswitchinterval(self._switch)
+        if self._timeline:
+            self._timeline.close()
+        wall, cpu = time.perf_counter() - self._wall0, time.process_time() - self._cpu0
+        try:
+            self.write_reports(wall, cpu)
+        except OSError as e:  # pragma: no cover
+            logger.warning("Could not write profile for %s: %s", self.trace_id, e)
+
+    def _top_from_samples(self) -> Dict[str, List[Dict[str, Any]]]:
+        self_counts: Counter = Counter()
+        incl_counts: Counter = Counter()
+        for stack, n in self._sampler.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += n
+            for f in set(frames):
+                if not f.startswith(_SCAFFOLDING) and not f.endswith(":<module>"):
+                    incl_counts[f] += n
+        total = sum(self._sampler.stacks.values()) or 1
+        n = config.profile_top_n
+        return {
+            "self": [{"function": f, "samples": c, "share": c / total} for f, c in self_counts.most_common(n)],
+            "inclusive": [{"function": f, "samples": c, "share": c / total} for f, c in incl_counts.most_common(n)],
+        }
+
+    def _top_from_cprofile(self) -> Dict[str, List[Dict[str, Any]]]:
+        stats = pstats.Stats(self._cprofile)
+        rows = []
+        for (filename, _line, func), (_cc, nc, tt, ct, _callers) in stats.stats.items():
+            if (Path(filename).stem, func) in _IDLE_FRAMES or (filename == "~" and "of 'select." in func):
+                continue  # event loop waiting for I/O
+            rows.append({"function": _label(filename, func) if filename != "~" else func, "calls": nc, "tottime": tt, "cumtime": ct})
+        total = sum(r["tottime"] for r in rows) or 1.0
+        n = config.profile_top_n
+        by_self = sorted(rows, key=lambda r: r["tottime"], reverse=True)[:n]
+        by_cum = sorted(
+            (r for r in rows if not r["function"].startswith(_SCAFFOLDING) and not r["function"].endswith(":<module>")),
+            key=lambda r: r["cumtime"], reverse=True,
+        )[:n]
+        return {
+            "self": [dict(r, share=r["tottime"] / total) for r in by_self],
+            "inclusive": [dict(r, share=r["cumtime"] / total) for r in by_cum],
+        }
+
+    def write_reports(self, wall: float, cpu: float) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        samples = sum(self._sampler.stacks.values())
+        with open(self.out_dir / "collapsed.txt", "w", encoding="utf-8") as f:
+            for stack, n in self._sampler.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        if self._cprofile:
+            self._cprofile.dump_stats(str(self.out_dir / "profile.pstats"))
+            top = self._top_from_cprofile()
+        else:
+            top = self._top_from_samples()
+        report = {
+            "trace_id": self.trace_id,
+            "mode": self.mode,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "interval": config.profile_interval,
+            "cpu_samples": samples,
+            "idle_samples": self._sampler.idle,
+            **top,
+        }
+        (self.out_dir / "top.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+        (self.out_dir / "top.txt").write_text(format_top(report), encoding="utf-8")
+        if self._timeline:
+            (self.out_dir / "timeline.json").write_text(
+                json.dumps({"traceEvents": self._timeline.events, "displayTimeUnit": "ms"}), encoding="utf-8"
+            )
+        logger.info(
+            "Profile %s written to %s (wall=%.2fs cpu=%.2fs samples=%d idle=%d)",
+            self.mode, self.out_dir, wall, cpu, samples, self._sampler.idle,
+        )
+        return self.out_dir
+
+
+def format_top(report: Dict[str, Any]) -> str:
+    lines = [
+        f"trace={report['trace_id']} mode={report['mode']} wall={report['wall_seconds']:.3f}s "
+        f"cpu={report['cpu_seconds']:.3f}s samples={report['cpu_samples']} idle={report['idle_samples']}",
+    ]
+    for kind in ("self", "inclusive"):
+        lines.append(f"\n# top {len(report[kind])} by {kind}")
+        for row in report[kind]:
+            detail = f"{row['samples']:>6} samples" if "samples" in row else f"{row['tottime']:.4f}s self {row['cumtime']:.4f}s cum {row['calls']} calls"
+            lines.append(f"{row['share'] * 100:6.2f}%  {detail}  {row['function']}")
+    return "\n".join(lines) + "\n"
+
+
+def load_report(trace_id: str, profile_dir: Optional[str] = None) -> Dict[str, Any]:
+    path = Path(profile_dir or config.profile_dir) / trace_id / "top.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare_reports(base: Dict[str, Any], new: Dict[str, Any], threshold: Optional[float] = None,
+                    min_share: Optional[float] = None) -> Dict[str, Any]:
+    """Flag functions whose inclusive share grew by more than ``threshold`` (relative) between runs.
+
+    Shares are fractions of each run's CPU samples (or cProfile time), so runs of
+    different length compare. Functions new to the top list count as regressions
+    once above ``min_share``. Between two sampled runs a change must also clear
+    ``config.profile_regression_z`` standard errors. CPU seconds per run are
+    compared against ``threshold`` too.
+    """
+    threshold = config.profile_regression_threshold if threshold is None else threshold
+    min_share = config.profile_min_share if min_share is None else min_share
+    before = {r["function"]: r["share"] for r in base.get("inclusive", [])}
+    after = {r["function"]: r["share"] for r in new.get("inclusive", [])}
+    # Sampled shares are noisy at low counts: also require a two-proportion z-score
+    sampled = base.get("mode") == new.get("mode") == "sample"
+    n_b, n_a = base.get("cpu_samples") or 0, new.get("cpu_samples") or 0
+    regressions, improvements = [], []
+    for func in sorted(set(before) | set(after)):
+        b, a = before.get(func, 0.0), after.get(func, 0.0)
+        if max(a, b) < min_share:
+            continue
+        if sampled and n_b and n_a:
+            pooled = (b * n_b + a * n_a) / (n_b + n_a)
+            se = math.sqrt(pooled * (1 - pooled) * (1 / n_b + 1 / n_a)) or 1.0
+            if abs(a - b) / se < config.profile_regression_z:
+                continue
+        change = (a - b) / b if b else None  # None: not in the base run's top list
+        row = {"function": func, "before": b, "after": a, "change": change}
+        if a > b and (change is None or change > threshold):
+            regressions.append(row)
+        elif b - a > 0 and (b - a) / b > threshold:
+            improvements.append(row)
+    regressions.sort(key=lambda r: r["after"] - r["before"], reverse=True)
+    improvements.sort(key=lambda r: r["before"] - r["after"], reverse=True)
+    cpu_b, cpu_a = base.get("cpu_seconds", 0.0), new.get("cpu_seconds", 0.0)
+    return {
+        "base": base.get("trace_id"),
+        "new": new.get("trace_id"),
+        "cpu_seconds": {"before": cpu_b, "after": cpu_a, "regressed": bool(cpu_b) and (cpu_a - cpu_b) / cpu_b > threshold},
+        "regressions": regressions,
+        "improvements": improvements,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and compare run profiles")
+    parser.add_argument("--dir", help="Profile directory (default config.profile_dir)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_top = sub.add_parser("top", help="Print a run's top-N report")
+    p_top.add_argument("trace_id")
+    p_cmp = sub.add_parser("compare", help="Flag hot-path regressions of NEW against BASE (exit 1 if any)")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, help="Relative share increase to flag (default config.profile_regression_threshold)")
+    p_cmp.add_argument("--min-share", type=float, help="Ignore functions below this share in both runs")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "top":
+        print(format_top(load_report(args.trace_id, args.dir)), end="")
+        return 0
+    result = compare_reports(load_report(args.base, args.dir), load_report(args.new, args.dir), args.threshold, args.min_share)
+    print(json.dumps(result, indent=2))
+    return 1 if result["regressions"] or result["cpu_seconds"]["regressed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ import os
 import json
 import logging
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from tavily import TavilyClient
 from .config import config
 from .utils import retry_with_backoff
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 class SearchProvider:
     """Abstract base class for search providers."""
     @retry_with_backoff()
-    async def search(self, query: str) -> List[Dict[str, Any]]:  # pragma: no cover - interface
+    async def search(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:  # pragma: no cover - interface
         raise NotImplementedError
 
 class TavilySearchProvider(SearchProvider):
@@ -25,9 +25,9 @@ class TavilySearchProvider(SearchProvider):
             raise ValueError("TAVILY_API_KEY appears to be a placeholder. Please set a real key in .env or environment.")
         self.client = TavilyClient(api_key=api_key)
 
-    async def search(self, query: str) -> List[Dict[str, Any]]:
+    async def search(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
         start = time.time()
-        results = self.client.search(query=query, max_results=config.max_search_results)
+        results = self.client.search(query=query, max_results=max_results or config.max_search_results)
         elapsed = time.time() - start
         items = results.get("results", []) or []
         top_titles = [r.get("title") for r in items[:3]]
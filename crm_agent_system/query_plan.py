@@ -0,0 +1,208 @@
+"""Query planning for ``search_crm_info``.
+
+Expands a CRM's aspects into a set of provider queries:
+- ``single``: one query per aspect (the historical behaviour).
+- ``merged``: one query covering a configured aspect group (e.g. pricing +
+  limitations) when past runs showed it still returns enough useful hits per aspect.
+- ``split``: integrations fanned out into marketplace-specific queries when that
+  measurably widened coverage.
+
+Query strings are compiled once per (CRM, variant) and reused. Per-variant yield
+(useful snippets and evidence units per aspect, provider calls) is recorded in
+memory and merged into ``config.query_plan_path`` once per run
+(``flush_query_plan_stats``, file lock plus atomic replace) so later runs start
+from the learned plan.
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import config
+from .search_depth import evidence_units
+from .utils import atomic_write_json, locked_file, read_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlannedQuery:
+    text: str
+    aspects: Tuple[str, ...]
+    variant: str
+
+
+@dataclass
+class QueryPlan:
+    crm_name: str
+    queries: List[PlannedQuery] = field(default_factory=list)
+
+    @property
+    def variants(self) -> Dict[str, Tuple[str, ...]]:
+        """variant key -> aspects it covers."""
+        out: Dict[str, Tuple[str, ...]] = {}
+        for q in self.queries:
+            out.setdefault(q.variant, q.aspects)
+        return out
+
+
+@lru_cache(maxsize=4096)
+def compile_query(crm_name: str, aspects: Tuple[str, ...], extra: str = "") -> str:
+    """Provider query for ``aspects`` (templates joined), matching ``search_crm_info``'s format."""
+    templates = " ".join(config.aspect_query_templates.get(a, a) for a in aspects)
+    return f"{crm_name} CRM {extra or templates} small business B2B"
+
+
+def _variant_key(kind: str, aspects: Sequence[str]) -> str:
+    return f"{kind}:{'+'.join(aspects)}"
+
+
+class PlanStats:
+    """Per-variant yield history persisted as JSON across runs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or config.query_plan_path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = read_json(self.path, {})
+        self._pending: List[Tuple[str, int, Dict[str, int], Dict[str, int]]] = []
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._data.get(key)
+
+    def avg_hits(self, key: str, aspect: str) -> float:
+        entry = self._data.get(key)
+        if not entry or not entry.get("runs"):
+            return 0.0
+        return entry["hits"].get(aspect, 0) / entry["runs"]
+
+    def avg_units(self, key: str, aspect: str) -> float:
+        entry = self._data.get(key)
+        if not entry or not entry.get("runs"):
+            return 0.0
+        return entry["units"].get(aspect, 0) / entry["runs"]
+
+    @staticmethod
+    def _apply(data: Dict[str, Dict[str, Any]], key: str, calls: int, hits: Dict[str, int], units: Dict[str, int]) -> None:
+        entry = data.setdefault(key, {"runs": 0, "calls": 0, "hits": {}, "units": {}})
+        entry["runs"] += 1
+        entry["calls"] += calls
+        for aspect, n in hits.items():
+            entry["hits"][aspect] = entry["hits"].get(aspect, 0) + n
+        for aspect, n in units.items():
+            entry["units"][aspect] = entry["units"].get(aspect, 0) + n
+
+    def record(self, key: str, calls: int, hits: Dict[str, int], units: Dict[str, int]) -> None:
+        """Fold one execution into the in-memory stats; ``flush`` persists it."""
+        with self._lock:
+            self._apply(self._data, key, calls, hits, units)
+            self._pending.append((key, calls, hits, units))
+
+    def flush(self) -> None:
+        """Merge pending observations into the file (locked read-merge-write, atomic replace)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with locked_file(self.path):
+                data = read_json(self.path, {})
+                for obs in pending:
+                    self._apply(data, *obs)
+                atomic_write_json(self.path, data)
+        except OSError as e:  # pragma: no cover
+            logger.warning("Could not persist query plan stats %s: %s", self.path, e)
+            return
+        with self._lock:
+            for obs in self._pending:  # recorded while flushing
+                self._apply(data, *obs)
+            self._data = data
+
+
+class QueryPlanner:
+    """Chooses and caches a query plan per (CRM, aspects) from recorded yields."""
+
+    def __init__(self, stats: Optional[PlanStats] = None):
+        self.stats = stats or PlanStats()
+        self._plans: Dict[Tuple[str, Tuple[str, ...]], QueryPlan] = {}
+
+    def _use_merged(self, group: Tuple[str, ...]) -> bool:
+        merged = _variant_key("merged", group)
+        if self.stats.get(merged) is None:
+            # Explore a merged query once every member has a single-query baseline
+            return all(self.stats.get(_variant_key("single", (a,))) for a in group)
+        return all(self.stats.avg_hits(merged, a) >= config.query_plan_min_hits for a in group)
+
+    def _use_split(self) -> bool:
+        split = _variant_key("split", ("integrations",))
+        single = _variant_key("single", ("integrations",))
+        if self.stats.get(single) is None:
+            return False
+        if self.stats.get(split) is None:
+            return True
+        return self.stats.avg_units(split, "integrations") >= config.query_plan_split_gain * self.stats.avg_units(single, "integrations")
+
+    def plan(self, crm_name: str, aspects: Sequence[str]) -> QueryPlan:
+        key = (crm_name, tuple(aspects))
+        cached = self._plans.get(key)
+        if cached is not None:
+            return cached
+        plan = QueryPlan(crm_name)
+        remaining = list(aspects)
+        for group in config.query_plan_merge_groups:
+            group = tuple(a for a in group if a in remaining)
+            if len(group) > 1 and self._use_merged(group):
+                plan.queries.append(PlannedQuery(compile_query(crm_name, group), group, _variant_key("merged", group)))
+                remaining = [a for a in remaining if a not in group]
+        for aspect in remaining:
+            if aspect == "integrations" and config.query_plan_integration_splits and self._use_split():
+                variant = _variant_key("split", (aspect,))
+                for extra in config.query_plan_integration_splits:
+                    plan.queries.append(PlannedQuery(compile_query(crm_name, (aspect,), extra), (aspect,), variant))
+            else:
+                plan.queries.append(PlannedQuery(compile_query(crm_name, (aspect,)), (aspect,), _variant_key("single", (aspect,))))
+        self._plans[key] = plan
+        logger.debug("Query plan crm=%s queries=%d variants=%s", crm_name, len(plan.queries), list(plan.variants))
+        return plan
+
+    def record(self, plan: QueryPlan, per_aspect: Dict[str, List[Any]], integration_keywords: Iterable[str] = ()) -> None:
+        """Fold one execution's routed results (aspect -> items) into the variant stats."""
+        keywords = list(integration_keywords)
+        for variant, aspects in plan.variants.items():
+            calls = sum(1 for q in plan.queries if q.variant == variant)
+            hits = {a: sum(1 for item in per_aspect.get(a, []) if evidence_units(a, [item], keywords)) for a in aspects}
+            units = {a: len(evidence_units(a, per_aspect.get(a, []), keywords)) for a in aspects}
+            self.stats.record(variant, calls, hits, units)
+
+
+def route_results(query: PlannedQuery, items: List[Any], integration_keywords: Iterable[str] = ()) -> Dict[str, List[Any]]:
+    """Assign a query's results to the aspects it covers.
+
+    Merged queries give each aspect the items carrying evidence for it (falling back
+    to all items if none do) so per-aspect payloads stay focused.
+    """
+    if len(query.aspects) == 1:
+        return {query.aspects[0]: list(items)}
+    keywords = list(integration_keywords)
+    routed: Dict[str, List[Any]] = {}
+    for aspect in query.aspects:
+        matched = [item for item in items if evidence_units(aspect, [item], keywords)]
+        routed[aspect] = matched or list(items)
+    return routed
+
+
+_planner: Optional[QueryPlanner] = None
+
+
+def get_query_planner() -> QueryPlanner:
+    global _planner
+    if _planner is None or _planner.stats.path != Path(config.query_plan_path):
+        _planner = QueryPlanner()
+    return _planner
+
+
+def flush_query_plan_stats() -> None:
+    """Persist this process's query plan observations (no-op if no plan was recorded)."""
+    if _planner is not None:
+        _planner.stats.flush()
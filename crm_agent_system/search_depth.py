@@ -0,0 +1,167 @@
+"""Adaptive per-aspect search depth driven by marginal evidence yield.
+
+A search starts at a learned depth for its aspect and is deepened (depth doubles,
+capped at ``config.max_search_results``) only while the newly returned results
+keep contributing enough new evidence units (integration names, price points /
+priced tier names, limitation phrases, feature phrases). The depth at which each aspect
+saturated is folded into an exponential moving average persisted in
+``config.adaptive_history_path`` so later runs start at the learned depth.
+
+Deepening re-sends the same query with a larger ``max_results``, so an aspect
+that expands costs 2-3 provider calls instead of 1. The history therefore also
+tracks how often a deeper call actually added evidence. Once an aspect has
+``config.adaptive_explore_expansions`` expansions on record, it is only deepened
+while that payoff rate stays at or above ``config.adaptive_min_expansion_payoff``.
+
+Observations are kept in memory and merged into the file once per run
+(``flush_depth_history``) under a file lock with an atomic replace, so
+concurrent queue workers do not overwrite each other.
+"""
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import config
+from .utils import atomic_write_json, locked_file, read_json
+
+logger = logging.getLogger(__name__)
+
+_PRICE_RE = re.compile(r"\$\s?\d[\d,]*(?:\.\d+)?")
+_TIERS = r"free|starter|standard|professional|enterprise|essentials|unlimited|basic|premium|growth|pro|team|business|plus"
+# A tier name only counts next to a price ("Pro: $50", "Starter plan at $20", "Free: free for ...");
+# bare words like "business" or "pro" appear in every query and most snippets.
+_TIER_PRICE_RE = re.compile(
+    rf"\b({_TIERS})\b(?:\s+(?:plan|tier|edition))?(?:\s*[:\-\u2013]\s*(?:from\s+)?(?:\$\s?\d|free\b)|\s+(?:from\s+|at\s+)?\$\s?\d)"
+)
+_FREE_PLAN_RE = re.compile(r"\bfree\s+(?:plan|tier|edition|version|forever|for\s+(?:up\s+to\s+)?\d+\s+users?)\b")
+_APP_COUNT_RE = re.compile(r"\b(\d[\d,]*\+?)\s+(?:apps|integrations)\b")
+_LIMIT_CUES = ("limit", "lack", "no ", "not ", "only", "expensive", "steep", "complex", "cannot", "missing", "restrict")
+_PHRASE_SPLIT = re.compile(r"[,.;:\n•|]+")
+
+
+def _text(item: Any) -> str:
+    if isinstance(item, dict):
+        return " ".join(str(item.get(k) or "") for k in ("title", "content"))
+    return str(item)
+
+
+def evidence_units(aspect: str, items: Iterable[Any], integration_keywords: Iterable[str] = ()) -> Set[str]:
+    """Distinct evidence units an aspect's results contribute (used to measure marginal yield)."""
+    units: Set[str] = set()
+    for item in items:
+        text = _text(item)
+        lower = text.lower()
+        if aspect == "pricing":
+            units.update(p.replace(" ", "") for p in _PRICE_RE.findall(text))
+            units.update(_TIER_PRICE_RE.findall(lower))
+            if _FREE_PLAN_RE.search(lower):
+                units.add("free")
+        elif aspect == "integrations":
+            units.update(kw for kw in integration_keywords if kw.lower() in lower)
+            units.update(f"{n} apps" for n in _APP_COUNT_RE.findall(lower))
+        else:
+            for phrase in _PHRASE_SPLIT.split(lower):
+                words = phrase.split()
+                if not words:
+                    continue
+                if aspect == "limitations" and not any(cue in f" {phrase} " for cue in _LIMIT_CUES):
+                    continue
+                if len(words) <= 8:
+                    units.add(" ".join(words))
+    return units
+
+
+class DepthHistory:
+    """Per-aspect learned starting depth, persisted as JSON across runs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or config.adaptive_history_path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = read_json(self.path, {})
+        self._pending: List[Tuple[str, int, int, int]] = []
+
+    def start_depth(self, aspect: str) -> int:
+        entry = self._data.get(aspect)
+        depth = round(entry["depth"]) if entry else config.adaptive_initial_depth
+        return max(config.adaptive_min_depth, min(depth, config.max_search_results))
+
+    def expansion_pays(self, aspect: str) -> bool:
+        """True while exploring, or if past deeper calls added evidence often enough."""
+        entry = self._data.get(aspect) or {}
+        expansions = entry.get("expansions", 0)
+        if expansions < config.adaptive_explore_expansions:
+            return True
+        return entry.get("paid", 0) / expansions >= config.adaptive_min_expansion_payoff
+
+    @staticmethod
+    def _apply(data: Dict[str, Dict[str, float]], aspect: str, saturation_depth: int, expansions: int, paid: int) -> None:
+        alpha = config.adaptive_history_alpha
+        entry = data.get(aspect)
+        if entry:
+            entry["depth"] = (1 - alpha) * entry["depth"] + alpha * saturation_depth
+            entry["runs"] = entry.get("runs", 0) + 1
+        else:
+            entry = data[aspect] = {"depth": float(saturation_depth), "runs": 1}
+        entry["expansions"] = entry.get("expansions", 0) + expansions
+        entry["paid"] = entry.get("paid", 0) + paid
+
+    def record(self, aspect: str, saturation_depth: int, expansions: int = 0, paid: int = 0) -> None:
+        """Fold one search into the in-memory history; ``flush`` persists it."""
+        with self._lock:
+            self._apply(self._data, aspect, saturation_depth, expansions, paid)
+            self._pending.append((aspect, saturation_depth, expansions, paid))
+
+    def flush(self) -> None:
+        """Merge pending observations into the file (locked read-merge-write, atomic replace)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with locked_file(self.path):
+                data = read_json(self.path, {})
+                for obs in pending:
+                    self._apply(data, *obs)
+                atomic_write_json(self.path, data)
+        except OSError as e:  # pragma: no cover
+            logger.warning("Could not persist depth history %s: %s", self.path, e)
+            return
+        with self._lock:
+            for obs in self._pending:  # recorded while flushing
+                self._apply(data, *obs)
+            self._data = data
+
+
+_history: Optional[DepthHistory] = None
+
+
+def get_depth_history() -> DepthHistory:
+    global _history
+    if _history is None or _history.path != Path(config.adaptive_history_path):
+        _history = DepthHistory()
+    return _history
+
+
+def flush_depth_history() -> None:
+    """Persist this process's depth observations (no-op if adaptive search never ran)."""
+    if _history is not None:
+        _history.flush()
+
+
+def next_depth(depth: int) -> int:
+    return min(depth * 2, config.max_search_results)
+
+
+def plan_expansion(previous: List[Any], current: List[Any], aspect: str, integration_keywords: Iterable[str] = ()) -> Dict[str, Any]:
+    """Decide whether to deepen: compare evidence in ``current`` against its first ``len(previous)`` results.
+
+    Returns ``{new_units, expand}``; ``expand`` is False once the extra results add fewer than
+    ``config.adaptive_min_new_units`` new units or the provider returned nothing new.
+    """
+    seen = evidence_units(aspect, previous, integration_keywords)
+    extra = current[len(previous):]
+    new_units = evidence_units(aspect, extra, integration_keywords) - seen
+    expand = bool(extra) and len(new_units) >= config.adaptive_min_new_units
+    return {"new_units": len(new_units), "expand": expand}
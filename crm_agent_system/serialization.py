@@ -0,0 +1,89 @@
+"""Compact, schema-versioned persistence and fast bulk loading for ``CRMData``.
+
+Record files are JSON lines: a header ``{"schema": "crmdata", "v": 1}`` followed
+by one ``CRMData`` per line, dumped by pydantic-core with defaults omitted.
+
+Loading goes through pydantic-core's JSON validator in a single call for the
+whole file (or report), which skips building intermediate Python dicts. With
+pydantic v2 this is the fastest way to rebuild our own data: a
+``model_construct``-based "trusted" path runs in Python and measured slower than
+validation here, so it is deliberately not used.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+from .models import CRMData
+
+SCHEMA = "crmdata"
+SCHEMA_VERSION = 1
+
+_CRM = TypeAdapter(CRMData)
+_CRM_LIST = TypeAdapter(List[CRMData])
+
+
+class _Placeholder(BaseModel):
+    """The ``{}`` entry ``AnalysisAgent`` writes for a CRM whose research failed."""
+    model_config = ConfigDict(extra="forbid")
+
+
+class _ReportView(BaseModel):
+    """Only the part of a ``crm_report_<trace>.json`` that holds CRMData (other keys ignored)."""
+    detailed_data: Dict[str, Union[CRMData, _Placeholder]] = {}
+
+
+def dump_crm(crm: CRMData) -> bytes:
+    """Compact JSON for one record (defaults omitted; restored on load)."""
+    return crm.__pydantic_serializer__.to_json(crm, exclude_defaults=True)
+
+
+def crm_from_json(data: Union[str, bytes]) -> CRMData:
+    """Validate one JSON-encoded record (e.g. a stored queue result) without an intermediate dict."""
+    return _CRM.validate_json(data)
+
+
+def crms_from_json_lines(lines: Iterable[bytes]) -> List[CRMData]:
+    """Validate many JSON-encoded records in one pydantic-core pass."""
+    body = b",".join(line.strip() for line in lines if line.strip())
+    return _CRM_LIST.validate_json(b"[" + body + b"]")
+
+
+def save_records(path: Union[str, Path], records: Iterable[CRMData], append: bool = False) -> int:
+    """Write records as JSON lines (header written for new files). Returns records written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not (append and path.exists() and path.stat().st_size > 0)
+    count = 0
+    with open(path, "ab" if append else "wb") as f:
+        if write_header:
+            f.write(json.dumps({"schema": SCHEMA, "v": SCHEMA_VERSION}).encode() + b"\n")
+        for crm in records:
+            f.write(dump_crm(crm) + b"\n")
+            count += 1
+    return count
+
+
+def load_records(path: Union[str, Path]) -> List[CRMData]:
+    """Load a ``save_records`` file. Raises ValueError for a missing header or unsupported version."""
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        try:
+            header = json.loads(header_line or b"null")
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("schema") != SCHEMA:
+            raise ValueError(f"{path}: not a {SCHEMA} record file")
+        if header.get("v") != SCHEMA_VERSION:
+            raise ValueError(f"{path}: unsupported {SCHEMA} schema version {header.get('v')} (expected {SCHEMA_VERSION})")
+        return crms_from_json_lines(f)
+
+
+def load_report_crms(path: Union[str, Path]) -> Dict[str, CRMData]:
+    """``detailed_data`` of a stored comparison report as CRMData, parsed and validated in one pass.
+
+    Placeholder entries of CRMs whose research failed are skipped.
+    """
+    detailed = _ReportView.model_validate_json(Path(path).read_bytes()).detailed_data
+    return {name: data for name, data in detailed.items() if isinstance(data, CRMData)}
@@ -1,8 +1,17 @@
 import asyncio
+import json
+import os
 import time
 import logging
+from contextlib import contextmanager
 from functools import wraps
-from typing import Callable, Any, Coroutine, Optional
+from pathlib import Path
+from typing import Callable, Any, Coroutine, Iterator, Optional, List
+
+try:  # POSIX advisory locks; elsewhere writes are still atomic, just not serialized
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
 from .config import config
 
 logger = logging.getLogger(__name__)
@@ -40,3 +49,44 @@ def retry_with_backoff(max_retries: Optional[int] = None, delay: Optional[float]
             return wraps(func)(async_inner)
         return wraps(func)(sync_inner)
     return decorator
+
+def append_bounded(items: Optional[List[Any]], item: Any, limit: Optional[int]) -> List[Any]:
+    """Append ``item`` and keep only the newest ``limit`` entries (ring-buffer semantics).
+
+    ``limit`` of None or <= 0 disables trimming. Returns a list suitable for storing back in state.
+    """
+    items = list(items or [])
+    items.append(item)
+    if limit and limit > 0 and len(items) > limit:
+        del items[: len(items) - limit]
+    return items
+
+@contextmanager
+def locked_file(path: Path) -> Iterator[None]:
+    """Hold an exclusive cross-process lock (``<path>.lock``) for a read-merge-write of ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def read_json(path: Path, default: Any) -> Any:
+    """Parsed JSON from ``path``, or ``default`` if it is missing or unreadable."""
+    if not path.exists():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable %s: %s", path, e)
+        return default
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON via a temp file + rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
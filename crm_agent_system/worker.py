@@ -0,0 +1,164 @@
+"""Research worker processes draining the work queue.
+
+Each worker leases ``research`` jobs, runs ``ResearchAgent.research_crm`` and
+stores the serialized ``CRMData``. Start several on the host that holds the
+queue (``--processes``); the SQLite backend is single-host:
+
+    python -m crm_agent_system.worker --processes 4
+"""
+import argparse
+import asyncio
+import copy
+import logging
+import multiprocessing
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import config
+from .query_plan import flush_query_plan_stats
+from .search_depth import flush_depth_history
+from .workqueue import Job, WorkQueue, default_worker_id, get_work_queue
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_JOB = "research"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+# Driver settings that change what research_crm does; sent with every job and applied by the worker
+RESEARCH_SETTINGS = (
+    "aspects",
+    "max_search_results",
+    "aspect_query_templates",
+    "dedup_enabled",
+    "adaptive_search",
+    "query_planning",
+    "llm_model",
+    "llm_task_models",
+    "model_routing",
+)
+
+
+def research_payload(crm_name: str) -> Dict[str, Any]:
+    """Job payload carrying the config a worker needs to reproduce a local research call."""
+    payload: Dict[str, Any] = {"crm_name": crm_name}
+    for key in RESEARCH_SETTINGS:
+        payload[key] = copy.deepcopy(getattr(config, key))
+    return payload
+
+
+def apply_research_settings(payload: Dict[str, Any]) -> None:
+    """Adopt the driver's research settings from a job payload (keys it lacks keep the worker's config)."""
+    for key in RESEARCH_SETTINGS:
+        if key in payload:
+            setattr(config, key, payload[key])
+
+
+def _research_handler() -> JobHandler:
+    # Imported lazily: building the graph module instantiates the LLM and search provider
+    from .agents import ResearchAgent
+    from .workflow import llm, model_router, search_crm_info
+
+    agent = ResearchAgent(llm, search_crm_info, router=model_router)
+
+    async def handle(payload: Dict[str, Any]) -> Any:
+        # Models resolve per call through the router, so llm_model / llm_task_models apply too
+        apply_research_settings(payload)
+        data = await agent.research_crm(payload["crm_name"])
+        await asyncio.to_thread(flush_depth_history)
+        await asyncio.to_thread(flush_query_plan_stats)
+        return data.model_dump()
+
+    return handle
+
+
+async def _run_job(queue: WorkQueue, job: Job, worker_id: str, handler: JobHandler) -> None:
+    work = asyncio.ensure_future(handler(job.payload))
+    lost = asyncio.Event()
+
+    async def keep_alive():
+        while True:
+            await asyncio.sleep(config.queue_lease_seconds / 3)
+            if not await asyncio.to_thread(queue.heartbeat, job.id, worker_id):
+                # Cancelled by the dispatcher or re-leased elsewhere: stop spending calls on it
+                logger.warning("Lost lease on job %s; abandoning it", job.id)
+                lost.set()
+                work.cancel()
+                return
+
+    beat = asyncio.create_task(keep_alive())
+    try:
+        result = await work
+    except asyncio.CancelledError:
+        if not lost.is_set():
+            raise
+    except Exception as e:
+        logger.error("Job %s failed on %s (attempt %d): %s", job.id, worker_id, job.attempts, e)
+        await asyncio.to_thread(queue.fail, job.id, worker_id, str(e))
+    else:
+        await asyncio.to_thread(queue.complete, job.id, worker_id, result)
+        logger.info("Job %s done on %s", job.id, worker_id)
+    finally:
+        beat.cancel()
+
+
+async def run_worker(
+    queue: WorkQueue,
+    handler: JobHandler,
+    worker_id: Optional[str] = None,
+    max_jobs: Optional[int] = None,
+    idle_exit: Optional[float] = None,
+) -> int:
+    """Lease and execute jobs until ``max_jobs`` are done or the queue stays empty for ``idle_exit`` seconds."""
+    worker_id = worker_id or default_worker_id()
+    done = 0
+    idle_since = time.monotonic()
+    while max_jobs is None or done < max_jobs:
+        job = await asyncio.to_thread(queue.lease, worker_id, [RESEARCH_JOB])
+        if job is None:
+            if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                break
+            await asyncio.sleep(config.queue_poll_interval)
+            continue
+        await _run_job(queue, job, worker_id, handler)
+        done += 1
+        idle_since = time.monotonic()
+    logger.info("Worker %s exiting after %d jobs", worker_id, done)
+    return done
+
+
+def _worker_main(queue_path: Optional[str], max_jobs: Optional[int], idle_exit: Optional[float], log_level: str,
+                 handler_factory: Callable[[], JobHandler] = _research_handler) -> None:
+    logging.basicConfig(level=getattr(logging, log_level.upper(), logging.INFO), format="[%(levelname)s] %(processName)s %(message)s")
+    if queue_path:
+        config.queue_path = queue_path
+    asyncio.run(run_worker(get_work_queue(), handler_factory(), max_jobs=max_jobs, idle_exit=idle_exit))
+
+
+def start_workers(processes: int, queue_path: Optional[str] = None, max_jobs: Optional[int] = None,
+                  idle_exit: Optional[float] = None, log_level: str = "INFO",
+                  handler_factory: Callable[[], JobHandler] = _research_handler) -> List[multiprocessing.Process]:
+    """Start ``processes`` worker processes on this machine (``handler_factory`` must be picklable)."""
+    procs = [
+        multiprocessing.Process(
+            target=_worker_main, args=(queue_path, max_jobs, idle_exit, log_level, handler_factory), name=f"worker-{i}"
+        )
+        for i in range(processes)
+    ]
+    for p in procs:
+        p.start()
+    return procs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CRM research queue worker")
+    parser.add_argument("--queue", help="Queue location (sqlite file path)")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine")
+    parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs (per process)")
+    parser.add_argument("--idle-exit", type=float, help="Exit after this many idle seconds")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    procs = start_workers(args.processes, args.queue, args.max_jobs, args.idle_exit, args.log_level)
+    for p in procs:
+        p.join()
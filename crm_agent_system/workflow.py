@@ -3,10 +3,12 @@ from langgraph.graph import StateGraph, END
 from langchain_core.tools import tool
 import json
 from .models import AgentState
-from .agents import OrchestratorAgent, ResearchAgent, AnalysisAgent, ValidatorAgent
+from .agents import OrchestratorAgent, ResearchAgent, AnalysisAgent, ValidatorAgent, CompletenessGate
+from .agents.validator import completeness_report
 from .providers import get_search_provider
 from .config import config
 from .utils import retry_with_backoff
+from .model_router import ModelRouter, StubChatModel, routed_llm
 
 logger = logging.getLogger(__name__)
 
@@ -17,37 +19,43 @@ import os
 import time
 import inspect
 
-def get_llm():
-    """Instantiate an OpenAI Chat model using OPENAI_API_KEY only."""
+def get_llm(model: str = ""):
+    """Instantiate a chat model (``config.llm_model`` by default); OpenAI uses OPENAI_API_KEY only."""
+    if config.llm_provider == "stub":
+        return StubChatModel(model or config.llm_model)
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY not set")
     safe_prefix = api_key[:5] + ("..." if len(api_key) > 5 else "")
     logger.debug(f"Using OpenAI key prefix: {safe_prefix}")
     return ChatOpenAI(
-        model=config.llm_model,
+        model=model or config.llm_model,
         temperature=config.llm_temperature,
         api_key=SecretStr(api_key),
     )
 
 search_provider = get_search_provider()
 llm = get_llm()
+model_router = ModelRouter(get_llm)
 
 @tool
-async def search_crm_info(crm_name: str, aspect: str) -> str:
+async def search_crm_info(crm_name: str, aspect: str, max_results: int = 0, query: str = "") -> str:
     """Async search for a CRM aspect; returns JSON list of result objects.
 
-    Uses the configured provider (Tavily) to fetch up to `config.max_search_results`.
+    Uses the configured provider (Tavily) to fetch up to `max_results` (default
+    `config.max_search_results`; adaptive search passes a smaller depth).
+    `query` overrides the aspect template (used by the query planner).
     Performs manual retry with exponential backoff. Returns JSON-encoded list or
     an error object.
     """
     # Build an aspect-specific query using configurable template
     template = config.aspect_query_templates.get(aspect, aspect)
-    query = f"{crm_name} CRM {template} small business B2B"
+    query = query or f"{crm_name} CRM {template} small business B2B"
+    depth = min(max_results or config.max_search_results, config.max_search_results)
     results = []
     for attempt in range(1, 1 + config.max_retries):
         try:
-            raw_call = search_provider.search(query)
+            raw_call = search_provider.search(query, max_results=depth)
             raw = await raw_call if inspect.isawaitable(raw_call) else raw_call
             results = raw or []
             logger.debug(
@@ -64,7 +72,7 @@ async def search_crm_info(crm_name: str, aspect: str) -> str:
             )
             time.sleep(backoff)
     # Trim to configured max
-    return json.dumps(results[: config.max_search_results])
+    return json.dumps(results[:depth])
 
 @tool
 def validate_data_completeness(crm_data: dict) -> dict:
@@ -74,41 +82,20 @@ def validate_data_completeness(crm_data: dict) -> dict:
     details, integrations, and limitations. Returns a mapping of CRM name to a
     dict: { score (0..1), issues (list[str]), complete (bool) }.
     """
-    report = {}
-    for name, data in crm_data.items():
-        score = 0
-        max_score = 100
-        issues = []
-        if getattr(data, "pricing_tiers", None):
-            score += 25
-        else:
-            issues.append("Missing pricing information")
-        features = getattr(data, "features", None)
-        if features and features.core_features:
-            score += 25
-        else:
-            issues.append("Missing feature details")
-        if getattr(data, "integrations", None):
-            score += 25
-        else:
-            issues.append("Missing integration data")
-        if getattr(data, "limitations", None):
-            score += 25
-        else:
-            issues.append("Missing limitations")
-        report[name] = {"score": score / max_score, "issues": issues, "complete": score == max_score}
-    return report
+    return completeness_report(crm_data)
 
 
 def create_agent_graph():
     orchestrator = OrchestratorAgent(llm)
-    research_agent = ResearchAgent(llm, search_crm_info)
-    analysis_agent = AnalysisAgent(llm)
+    research_agent = ResearchAgent(llm, search_crm_info, router=model_router)
+    analysis_agent = AnalysisAgent(routed_llm(model_router, "summary"))
     validator = ValidatorAgent(llm, validate_data_completeness)
+    gate = CompletenessGate(validate_data_completeness)
 
     workflow = StateGraph(AgentState)
     workflow.add_node("orchestrator", orchestrator)
     workflow.add_node("research", research_agent)
+    workflow.add_node("precheck", gate)
     workflow.add_node("analyze", analysis_agent)
     workflow.add_node("validate", validator)
 
@@ -125,7 +112,8 @@ def create_agent_graph():
         return "orchestrator"
 
     workflow.add_conditional_edges("orchestrator", route_next)
-    workflow.add_edge("research", "orchestrator")
+    workflow.add_edge("research", "precheck")
+    workflow.add_edge("precheck", "orchestrator")
     workflow.add_edge("analyze", "validate")
     workflow.add_edge("validate", "orchestrator")
     workflow.set_entry_point("orchestrator")
@@ -0,0 +1,315 @@
+"""Work-queue backends for dispatching research jobs to worker processes.
+
+Jobs move through ``pending -> leased -> done | failed``. A leased job whose
+lease expires (worker crashed / hung) becomes leasable again until
+``config.queue_max_attempts`` is exhausted, at which point it is marked failed.
+Jobs the dispatcher stopped waiting for are ``cancelled``: they are never
+leased again, and a worker still running one loses its lease on the next
+heartbeat. ``purge`` deletes finished rows older than ``config.queue_retention_seconds``.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class WorkQueue:
+    """Abstract base class for work-queue backends."""
+
+    def submit(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None) -> str:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, kinds: Optional[list] = None, lease_seconds: Optional[float] = None) -> Optional[Job]:  # pragma: no cover
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: Optional[float] = None) -> bool:  # pragma: no cover
+        raise NotImplementedError
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:  # pragma: no cover
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:  # pragma: no cover
+        raise NotImplementedError
+
+    def status(self, job_id: str) -> Dict[str, Any]:  # pragma: no cover
+        """Return ``{status, result, error, attempts}`` for a job."""
+        raise NotImplementedError
+
+    def statuses(self, job_ids: Sequence[str], raw: bool = False) -> Dict[str, Dict[str, Any]]:
+        """``status`` for many jobs (backends should answer in one round trip).
+
+        With ``raw=True`` each ``result`` is left as its stored JSON text.
+        """
+        out = {job_id: self.status(job_id) for job_id in job_ids}
+        if raw:
+            for info in out.values():
+                if info["result"] is not None:
+                    info["result"] = json.dumps(info["result"])
+        return out
+
+    def cancel(self, job_ids: Sequence[str], reason: str) -> int:  # pragma: no cover
+        """Mark unfinished jobs cancelled so no worker picks them up. Returns jobs cancelled."""
+        raise NotImplementedError
+
+    def purge(self, older_than: Optional[float] = None) -> int:  # pragma: no cover
+        """Delete finished jobs last updated more than ``older_than`` seconds ago. Returns rows deleted."""
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """SQLite-backed queue for multiple processes on one host.
+
+    WAL mode relies on shared memory between the processes, so the database must
+    sit on a local disk; do not put it on a network filesystem shared by several
+    machines. Multi-machine setups need a networked backend registered in
+    ``QUEUE_BACKENDS``.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or config.queue_path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_until REAL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, kind)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, payload, status, attempts, created, updated) "
+                "VALUES (?, ?, ?, 'pending', 0, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now),
+            )
+        return job_id
+
+    def lease(self, worker_id: str, kinds: Optional[list] = None, lease_seconds: Optional[float] = None) -> Optional[Job]:
+        lease_seconds = lease_seconds or config.queue_lease_seconds
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases that used up their attempts are failed rather than re-leased
+            conn.execute(
+                "UPDATE jobs SET status='failed', error=COALESCE(error, 'lease expired'), updated=? "
+                "WHERE status='leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, config.queue_max_attempts),
+            )
+            query = (
+                "SELECT * FROM jobs WHERE (status='pending' OR (status='leased' AND lease_until < ?))"
+            )
+            params: list = [now]
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY created LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == "leased":
+                logger.warning("Re-leasing expired job %s (previous worker=%s)", row["id"], row["worker"])
+            conn.execute(
+                "UPDATE jobs SET status='leased', worker=?, lease_until=?, attempts=attempts+1, updated=? WHERE id=?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+            return Job(id=row["id"], kind=row["kind"], payload=json.loads(row["payload"]), attempts=row["attempts"] + 1)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: Optional[float] = None) -> bool:
+        lease_seconds = lease_seconds or config.queue_lease_seconds
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until=?, updated=? WHERE id=? AND worker=? AND status='leased'",
+                (time.time() + lease_seconds, time.time(), job_id, worker_id),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status='done', result=?, lease_until=NULL, updated=? "
+                "WHERE id=? AND worker=? AND status='leased'",
+                (json.dumps(result), time.time(), job_id, worker_id),
+            )
+            if cur.rowcount != 1:
+                logger.warning("Discarding result for job %s from worker %s (lease lost)", job_id, worker_id)
+            return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with closing(self._connect()) as conn:
+            # Retryable until attempts are exhausted
+            conn.execute(
+                "UPDATE jobs SET status=CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error=?, worker=NULL, lease_until=NULL, updated=? WHERE id=? AND worker=? AND status='leased'",
+                (config.queue_max_attempts, error, time.time(), job_id, worker_id),
+            )
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        return self.statuses([job_id])[job_id]
+
+    def statuses(self, job_ids: Sequence[str], raw: bool = False) -> Dict[str, Dict[str, Any]]:
+        rows = {}
+        with closing(self._connect()) as conn:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i:i + 500]
+                for row in conn.execute(
+                    f"SELECT id, status, result, error, attempts, lease_until FROM jobs WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    rows[row["id"]] = row
+        return {job_id: self._status_from_row(rows.get(job_id), raw) for job_id in job_ids}
+
+    @staticmethod
+    def _status_from_row(row: Optional[sqlite3.Row], raw: bool = False) -> Dict[str, Any]:
+        if row is None:
+            return {"status": "missing", "result": None, "error": None, "attempts": 0}
+        status = row["status"]
+        if status == "leased" and row["lease_until"] < time.time() and row["attempts"] >= config.queue_max_attempts:
+            status = "failed"
+        return {
+            "status": status,
+            "result": (row["result"] if raw else json.loads(row["result"])) if row["result"] else None,
+            "error": row["error"] or ("lease expired" if status == "failed" else None),
+            "attempts": row["attempts"],
+        }
+
+    def cancel(self, job_ids: Sequence[str], reason: str) -> int:
+        cancelled = 0
+        with closing(self._connect()) as conn:
+            for i in range(0, len(job_ids), 500):
+                chunk = list(job_ids[i:i + 500])
+                cur = conn.execute(
+                    f"UPDATE jobs SET status='cancelled', error=?, lease_until=NULL, updated=? "
+                    f"WHERE status IN ('pending', 'leased') AND id IN ({','.join('?' * len(chunk))})",
+                    [reason, time.time(), *chunk],
+                )
+                cancelled += cur.rowcount
+        return cancelled
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        older_than = config.queue_retention_seconds if older_than is None else older_than
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # Pending jobs no dispatcher can still be waiting for (e.g. it crashed) are expired first
+            conn.execute(
+                "UPDATE jobs SET status='cancelled', error='expired', updated=? WHERE status='pending' AND created < ?",
+                (now, now - config.queue_result_timeout),
+            )
+            cur = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND updated < ?",
+                (now - older_than,),
+            )
+            return cur.rowcount
+
+
+QUEUE_BACKENDS = {
+    "sqlite": SQLiteWorkQueue,
+}
+
+
+def get_work_queue() -> WorkQueue:
+    cls = QUEUE_BACKENDS.get(config.queue_backend)
+    if not cls:
+        raise ValueError(f"Unknown queue backend: {config.queue_backend}")
+    return cls()
+
+
+async def dispatch_and_wait(
+    queue: WorkQueue, kind: str, payloads: Sequence[Dict[str, Any]], timeout: Optional[float] = None,
+    raw_results: bool = False, on_result: Optional[Callable[[int, Any], None]] = None,
+) -> List[Any]:
+    """Submit one job per payload and await their results.
+
+    Returns results in payload order; failed or timed-out jobs yield an Exception
+    (mirroring ``asyncio.gather(..., return_exceptions=True)``). Jobs still
+    unfinished on timeout (or if the caller is cancelled) are cancelled in the
+    queue so no worker spends search / LLM calls on them later. ``raw_results``
+    returns each result as its stored JSON text, for callers that validate it directly.
+    ``on_result(index, result)`` is called as each job settles, so callers can act on
+    early results while the rest are still running.
+    """
+    timeout = timeout or config.queue_result_timeout
+    purged = await asyncio.to_thread(queue.purge)
+    if purged:
+        logger.debug("Purged %d finished jobs", purged)
+    job_ids = [await asyncio.to_thread(queue.submit, kind, p) for p in payloads]
+    logger.info("Dispatched %d %s jobs to %s", len(job_ids), kind, type(queue).__name__)
+    results: Dict[str, Any] = {}
+    position = {job_id: i for i, job_id in enumerate(job_ids)}
+
+    def settle(job_id: str, result: Any) -> None:
+        results[job_id] = result
+        if on_result:
+            on_result(position[job_id], result)
+
+    deadline = time.monotonic() + timeout
+    try:
+        while len(results) < len(job_ids):
+            waiting = [j for j in job_ids if j not in results]
+            for job_id, info in (await asyncio.to_thread(queue.statuses, waiting, raw_results)).items():
+                if info["status"] == "done":
+                    settle(job_id, info["result"])
+                elif info["status"] in ("failed", "cancelled", "missing"):
+                    settle(job_id, RuntimeError(f"{kind} job {job_id} {info['status']}: {info['error']}"))
+            if len(results) < len(job_ids):
+                if time.monotonic() > deadline:
+                    for job_id in job_ids:
+                        if job_id not in results:
+                            settle(job_id, TimeoutError(f"{kind} job {job_id} not finished after {timeout}s"))
+                    break
+                await asyncio.sleep(config.queue_poll_interval)
+    finally:
+        unfinished = [j for j in job_ids if j not in results or isinstance(results[j], TimeoutError)]
+        if unfinished:
+            cancelled = await asyncio.to_thread(queue.cancel, unfinished, "dispatcher stopped waiting")
+            logger.warning("Cancelled %d unfinished %s jobs", cancelled, kind)
+    return [results[j] for j in job_ids]
+
+
+def default_worker_id() -> str:
+    return f"{os.uname().nodename if hasattr(os, 'uname') else 'host'}:{os.getpid()}"
@@ -0,0 +1,70 @@
+"""CRMData persistence benchmark: record files and stored reports vs per-record validation.
+
+Builds N synthetic CRMs, writes them with ``save_records`` and as a report's
+``detailed_data`` (one failed-research ``{}`` placeholder included), then times
+``load_records`` / ``load_report_crms`` against the pre-existing path
+(``json.load`` + ``CRMData(**d)`` per record). Prints JSON.
+
+    python -m demo.bench_records --crms 100 1000 5000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from crm_agent_system.models import CRMData
+from crm_agent_system.serialization import load_records, load_report_crms, save_records
+
+from .sim_extraction import build_crm_data
+from .synthetic_corpus import generate_corpus
+
+
+def _best(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(n: int, repeat: int, workdir: Path) -> Dict:
+    crms = [build_crm_data(name, blocks) for name, blocks in generate_corpus(n).items()]
+    records = workdir / f"records_{n}.jsonl"
+    report = workdir / f"report_{n}.json"
+    save_records(records, crms)
+    detailed = {c.name: c.model_dump() for c in crms}
+    detailed["Failed CRM"] = {}
+    report.write_text(json.dumps({"summary": "", "detailed_data": detailed}), encoding="utf-8")
+
+    def validate_dicts():
+        data = json.loads(report.read_text(encoding="utf-8"))["detailed_data"]
+        return {k: CRMData(**v) for k, v in data.items() if v}
+
+    loaded = load_records(records)
+    from_report = load_report_crms(report)
+    assert len(loaded) == n and len(from_report) == n and loaded == crms
+    return {
+        "crms": n,
+        "records_bytes": records.stat().st_size,
+        "report_bytes": report.stat().st_size,
+        "load_records_s": round(_best(lambda: load_records(records), repeat), 5),
+        "load_report_crms_s": round(_best(lambda: load_report_crms(report), repeat), 5),
+        "per_record_validation_s": round(_best(validate_dicts, repeat), 5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CRMData record / report loading benchmark")
+    parser.add_argument("--crms", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_size(n, args.repeat, Path(tmp)) for n in args.crms]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Offline scaling benchmark over a synthetic corpus.
+
+Drives ``build_crm_data``, ``AnalysisAgent.calculate_scores``,
+``ValidatorAgent.semantic_validation`` and ``format_comparison_table`` at
+increasing N and prints throughput, peak traced memory and log-log scaling
+exponents as JSON. Feature lists are parsed from each CRM's synthetic feature
+snippets, so ``semantic_validation`` sees realistic (partial) overlap rather
+than identical feature sets.
+
+    python -m demo.bench_scaling --sizes 10 50 100 500 --verbosity 2 --out output/bench_scaling.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from crm_agent_system.agents.analysis import AnalysisAgent
+from crm_agent_system.agents.validator import ValidatorAgent
+from crm_agent_system.config import config
+from crm_agent_system.formatters import format_comparison_table
+
+from .sim_extraction import build_crm_data
+from .synthetic_corpus import generate_corpus
+
+
+def _measure(fn: Callable, repeat: int):
+    """Best wall time over ``repeat`` runs plus tracemalloc peak of one traced run."""
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def run_size(n: int, seed: int, verbosity: int, repeat: int) -> Dict:
+    corpus = generate_corpus(n, seed=seed, verbosity=verbosity)
+    analysis = AnalysisAgent(llm=None)
+    validator = ValidatorAgent(llm=None, validation_tool=None)
+    saved_crms = config.crms
+    config.crms = list(corpus)
+    stages: Dict[str, Dict] = {}
+    try:
+        crm_data, t, peak = _measure(lambda: {c: build_crm_data(c, b) for c, b in corpus.items()}, repeat)
+        stages["build_crm_data"] = {"seconds": t, "peak_bytes": peak}
+        scores, t, peak = _measure(lambda: analysis.calculate_scores(crm_data), repeat)
+        stages["calculate_scores"] = {"seconds": t, "peak_bytes": peak}
+        issues, t, peak = _measure(lambda: asyncio.run(validator.semantic_validation(crm_data)), repeat)
+        stages["semantic_validation"] = {"seconds": t, "peak_bytes": peak, "issues": len(issues)}
+        comparison = {
+            "scores": scores,
+            "detailed_data": {k: v.model_dump() for k, v in crm_data.items()},
+        }
+        table, t, peak = _measure(lambda: format_comparison_table(comparison), repeat)
+        stages["format_comparison_table"] = {"seconds": t, "peak_bytes": peak, "chars": len(table)}
+    finally:
+        config.crms = saved_crms
+    for stats in stages.values():
+        stats["crms_per_sec"] = n / stats["seconds"] if stats["seconds"] > 0 else None
+    return {"n": n, "stages": stages}
+
+
+def scaling_exponents(runs: List[Dict]) -> Dict[str, List[Dict]]:
+    """Log-log slope of time vs N between consecutive sizes (1 ~ linear, 2 ~ quadratic)."""
+    curves: Dict[str, List[Dict]] = {}
+    for prev, cur in zip(runs, runs[1:]):
+        for stage, stats in cur["stages"].items():
+            t0, t1 = prev["stages"][stage]["seconds"], stats["seconds"]
+            slope = math.log(t1 / t0) / math.log(cur["n"] / prev["n"]) if t0 > 0 and t1 > 0 else None
+            curves.setdefault(stage, []).append({"from": prev["n"], "to": cur["n"], "exponent": slope})
+    return curves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline CRM pipeline scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 500])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbosity", type=int, default=1, help="Snippet verbosity 1..5")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per stage (best is reported)")
+    parser.add_argument("--out", help="Also write the JSON report to this path")
+    args = parser.parse_args()
+    runs = [run_size(n, args.seed, args.verbosity, args.repeat) for n in sorted(args.sizes)]
+    report = {
+        "seed": args.seed,
+        "verbosity": args.verbosity,
+        "runs": runs,
+        "scaling": scaling_exponents(runs),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""AgentState memory benchmark: bounded/compact retention vs unbounded full reports.
+
+Simulates repeated validate passes (and research errors) over N mock CRMs and
+reports retained state size and tracemalloc peak as JSON.
+
+    python -m demo.bench_state --crms 10 200 --iterations 10
+"""
+import argparse
+import json
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from crm_agent_system.agents.validator import completeness_report
+from crm_agent_system.config import config
+from crm_agent_system.models import CRMData, compact_report
+from crm_agent_system.utils import append_bounded
+
+from .mock_data import MOCK_SEARCH_DATA
+from .sim_extraction import build_crm_data
+
+
+def _mock_pool(n: int) -> Dict[str, CRMData]:
+    base = list(MOCK_SEARCH_DATA.items())
+    pool = {}
+    for i in range(n):
+        src, blocks = base[i % len(base)]
+        name = f"{src}-{i:04d}"
+        data = build_crm_data(name, blocks)
+        if i % 3 == 0:  # leave some CRMs incomplete so reports carry issues
+            data.limitations = []
+        pool[name] = data
+    return pool
+
+
+def _simulate(n: int, iterations: int, bounded: bool) -> Dict:
+    crm_data = _mock_pool(n)
+    state: Dict = {"crm_data": crm_data, "research_status": {}, "validation_results": [], "error_log": []}
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            report = completeness_report(crm_data)
+            if bounded:
+                # Same retention path as ValidatorAgent.__call__
+                state["validation_results"] = append_bounded(
+                    state["validation_results"], compact_report(report), config.validation_history_limit
+                )
+            else:
+                # Pre-retention behaviour: full report appended every pass, error log unbounded
+                state["validation_results"].append(report)
+            errors: List[Dict] = [
+                {"timestamp": datetime.now().isoformat(), "agent": "research", "error": "timeout", "crm": name}
+                for name in list(crm_data)[: max(1, n // 10)]
+            ]
+            if bounded:
+                for err in errors:
+                    state["error_log"] = append_bounded(state["error_log"], err, config.error_log_limit)
+            else:
+                state["error_log"].extend(errors)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    retained = len(json.dumps({"validation_results": state["validation_results"], "error_log": state["error_log"]}))
+    return {
+        "crms": n,
+        "iterations": iterations,
+        "mode": "bounded" if bounded else "unbounded",
+        "validation_reports": len(state["validation_results"]),
+        "error_log_entries": len(state["error_log"]),
+        "retained_bytes": retained,
+        "peak_traced_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentState retention memory benchmark")
+    parser.add_argument("--crms", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--iterations", type=int, default=config.max_iterations)
+    args = parser.parse_args()
+    results = []
+    for n in args.crms:
+        for bounded in (False, True):
+            results.append(_simulate(n, args.iterations, bounded))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
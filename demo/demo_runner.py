@@ -2,30 +2,35 @@
 import asyncio
 import argparse
 import random
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional
 
 from crm_agent_system.models import CRMData
 from crm_agent_system.agents.analysis import AnalysisAgent
 from crm_agent_system.formatters import format_comparison_table
 from crm_agent_system.config import config
+from crm_agent_system.profiling import PROFILE_MODES, Profiler
 
 from .mock_data import MOCK_SEARCH_DATA
 from .sim_extraction import build_crm_data
+from .synthetic_corpus import generate_corpus
 
 class DemoOrchestrator:
-    def __init__(self, fast: bool = False):
+    def __init__(self, fast: bool = False, corpus: Optional[Dict] = None):
         self.state: Dict = {
             "crm_data": {},
             "validation_results": [],
             "iteration": 0,
         }
         self.fast = fast
+        self.corpus = corpus if corpus is not None else MOCK_SEARCH_DATA
 
     async def simulate_research(self, crm: str) -> CRMData:
         delay = 0 if self.fast else 0.4
         await asyncio.sleep(delay)
-        blocks = MOCK_SEARCH_DATA.get(crm, {})
+        blocks = self.corpus.get(crm, {})
         return build_crm_data(crm, blocks)
 
     async def run(self):
@@ -54,9 +59,18 @@ def main():
     parser = argparse.ArgumentParser(description="Offline CRM multi-agent demo")
     parser.add_argument("--fast", action="store_true", help="Skip artificial delays")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Use a seeded synthetic corpus of N CRMs instead of the mock data")
+    parser.add_argument("--verbosity", type=int, default=1, help="Synthetic snippet verbosity 1..5")
+    parser.add_argument("--profile", nargs="?", const="sample", choices=PROFILE_MODES,
+                        help="Profile the run (default: sample) into output/profiles/<trace_id>/")
+    parser.add_argument("--trace-id", help="Profile report id (default: timestamp)")
     args = parser.parse_args()
 
     random.seed(args.seed)
+    corpus = None
+    if args.synthetic:
+        corpus = generate_corpus(args.synthetic, seed=args.seed, verbosity=args.verbosity)
+        config.crms = list(corpus)
 
     print("""
     ╔══════════════════════════════════════════╗
@@ -65,8 +79,14 @@ def main():
     ╚══════════════════════════════════════════╝
     """)
 
-    orchestrator = DemoOrchestrator(fast=args.fast)
-    state = asyncio.run(orchestrator.run())
+    orchestrator = DemoOrchestrator(fast=args.fast, corpus=corpus)
+    trace_id = args.trace_id or datetime.now().strftime("demo_%Y%m%d_%H%M%S")
+
+    async def run():
+        with Profiler(trace_id, args.profile) if args.profile else nullcontext():
+            return await orchestrator.run()
+
+    state = asyncio.run(run())
     comparison = state.get("final_comparison", {})
     if comparison:
         print("\n📊 COMPARISON TABLE:")
@@ -74,6 +94,8 @@ def main():
         print("\n💡 RECOMMENDATIONS:")
         for k, v in comparison.get("recommendations", {}).items():
             print(f"  • {k.replace('_', ' ').title()}: {v}")
+    if args.profile:
+        print(f"\n⏱️  Profile written to {Path(config.profile_dir) / trace_id}")
     print("\n✅ Demo complete.")
 
 if __name__ == "__main__":
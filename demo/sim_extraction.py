@@ -18,13 +18,33 @@ def extract_pricing(crm: str, raw: List[Dict]) -> List[PricingTier]:
     return tiers
 
 
+_AUTOMATION_CUES = ("automation", "sequence", "workflow", "scheduling", "approval")
+_ANALYTICS_CUES = ("report", "dashboard", "forecast", "analytics", "prediction")
+_CUSTOMIZATION_CUES = ("custom", "permission", "pipelines")
+
+
 def extract_features(raw: List[Dict]) -> CRMFeatures:
-    return CRMFeatures(
-        core_features=["Contact Management", "Deal Tracking", "Email Integration"],
-        automation=["Workflow Automation", "Email Sequences"],
-        analytics=["Reporting Dashboard", "Custom Reports"],
-        customization=["Custom Fields", "Custom Modules"],
-    )
+    """Bucket the comma-separated feature list of each snippet (text after "features:", first sentence)."""
+    names: List[str] = []
+    for item in raw:
+        content = item.get("content", "")
+        if "features:" in content.lower():
+            content = content[content.lower().index("features:") + len("features:"):]
+        first = content.strip().split(". ")[0].rstrip(".")
+        names.extend(f.strip().title() for f in first.split(",") if f.strip())
+    names = list(dict.fromkeys(names))
+    features = CRMFeatures()
+    for name in names:
+        lower = name.lower()
+        if any(c in lower for c in _AUTOMATION_CUES):
+            features.automation.append(name)
+        elif any(c in lower for c in _ANALYTICS_CUES):
+            features.analytics.append(name)
+        elif any(c in lower for c in _CUSTOMIZATION_CUES):
+            features.customization.append(name)
+        else:
+            features.core_features.append(name)
+    return features
 
 
 def extract_integrations(raw: List[Dict]) -> List[Integration]:
@@ -0,0 +1,93 @@
+"""Seeded synthetic search corpus for N CRMs (same shape as ``MOCK_SEARCH_DATA``).
+
+Each CRM gets pricing, features, integrations and limitations snippets built from
+realistic vocabularies. ``verbosity`` (1..5) scales snippets per aspect and the
+amount of filler prose per snippet, to exercise prompt-size sensitive paths.
+"""
+import random
+from typing import Dict, List
+
+_PREFIXES = ["Pipe", "Lead", "Deal", "Sales", "Client", "Nimbus", "Zen", "Core", "Apex", "Blue", "Swift", "Vertex", "Orbit", "Spark", "Atlas"]
+_SUFFIXES = ["ly", "flow", "desk", "hub", "base", "drive", "force", "stack", "track", "works", "sync", "pilot"]
+_TIER_NAMES = ["Free", "Starter", "Standard", "Professional", "Enterprise", "Essentials", "Unlimited", "Growth", "Business"]
+_FEATURES = [
+    "contact management", "deal tracking", "pipeline management", "email integration", "lead scoring",
+    "workflow automation", "email sequences", "task automation", "reporting dashboard", "custom reports",
+    "sales forecasting", "territory management", "custom fields", "custom modules", "mobile app",
+    "AI predictions", "meeting scheduling", "quotes", "live chat", "web forms", "approval processes",
+    "multiple pipelines", "role-based permissions", "API access", "activity timeline", "document tracking",
+]
+_INTEGRATIONS = [
+    "Slack", "Zapier", "Mailchimp", "Stripe", "Segment", "Shopify", "QuickBooks", "Gmail", "Outlook",
+    "Intercom", "Twilio", "Calendly", "Typeform", "Google Sheets", "Google Analytics", "Zoom", "WordPress",
+    "Xero", "DocuSign", "HubSpot", "Microsoft Teams", "Dropbox", "Trello", "Asana", "Jira", "Zendesk",
+]
+_LIMITATIONS = [
+    "Limited customization in lower tiers", "Steep learning curve", "Expensive for small teams",
+    "No phone support in entry plan", "API rate limits on lower tiers", "Complex UI for beginners",
+    "Storage limits per user", "Reporting limited without add-ons", "Requires admin resources",
+    "Only email support on free plan", "Lacks offline mode", "Limited automation runs per month",
+]
+_FILLER = [
+    "Reviewers frequently highlight this when comparing vendors for small B2B teams.",
+    "Pricing and packaging were updated for 2025 according to the vendor site.",
+    "Several analyst roundups echo this assessment.",
+    "Customers in the 10-50 employee range report mixed experiences.",
+    "The vendor positions this as a differentiator in its marketing material.",
+]
+
+
+def _crm_names(n: int, rng: random.Random) -> List[str]:
+    names: List[str] = []
+    seen = set()
+    while len(names) < n:
+        base = rng.choice(_PREFIXES) + rng.choice(_SUFFIXES)
+        name = base if base not in seen else f"{base} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def _filler(rng: random.Random, verbosity: int) -> str:
+    return " ".join(rng.choice(_FILLER) for _ in range(max(0, verbosity - 1)))
+
+
+def _snippet(crm: str, aspect: str, idx: int, content: str) -> Dict[str, str]:
+    slug = crm.lower().replace(" ", "-")
+    return {
+        "title": f"{crm} {aspect.title()}" + (f" ({idx})" if idx else ""),
+        "url": f"https://www.example-reviews.com/{slug}/{aspect}/{idx}",
+        "content": content,
+    }
+
+
+def generate_crm_blocks(crm: str, rng: random.Random, verbosity: int = 1) -> Dict[str, List[Dict[str, str]]]:
+    """Aspect -> snippet list for one synthetic CRM."""
+    snippets = max(1, verbosity)
+    tiers = sorted(rng.sample(_TIER_NAMES, rng.randint(2, 4)), key=_TIER_NAMES.index)
+    price = 0 if tiers[0] == "Free" else rng.choice([9, 12, 14, 15, 20, 25])
+    tier_text = []
+    for tier in tiers:
+        tier_text.append(f"{tier}: " + ("free for up to 3 users" if price == 0 else f"${price}/user/month"))
+        price = max(price, 10) * rng.choice([2, 2, 3]) + rng.choice([0, 5, 9])
+    blocks: Dict[str, List[Dict[str, str]]] = {"pricing": [], "features": [], "integrations": [], "limitations": []}
+    for i in range(snippets):
+        blocks["pricing"].append(_snippet(crm, "pricing", i, f"{crm} Pricing. " + ". ".join(tier_text) + ". " + _filler(rng, verbosity)))
+        feats = rng.sample(_FEATURES, rng.randint(4, 10))
+        blocks["features"].append(_snippet(crm, "features", i, f"{crm} features: " + ", ".join(feats) + ". " + _filler(rng, verbosity)))
+        integ = rng.sample(_INTEGRATIONS, rng.randint(3, 9))
+        apps = rng.choice([100, 300, 500, 1000, 2000])
+        blocks["integrations"].append(_snippet(
+            crm, "integrations", i,
+            f"Native: {', '.join(integ)}. {apps}+ apps via marketplace. " + _filler(rng, verbosity),
+        ))
+        lims = rng.sample(_LIMITATIONS, rng.randint(2, 4))
+        blocks["limitations"].append(_snippet(crm, "limitations", i, ". ".join(lims) + ". " + _filler(rng, verbosity)))
+    return blocks
+
+
+def generate_corpus(n: int, seed: int = 42, verbosity: int = 1) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+    """Build ``{crm: {aspect: [snippet, ...]}}`` for ``n`` CRMs, deterministic for a given seed."""
+    rng = random.Random(seed)
+    verbosity = max(1, min(int(verbosity), 5))
+    return {crm: generate_crm_blocks(crm, rng, verbosity) for crm in _crm_names(n, rng)}
@@ -0,0 +1,59 @@
+from crm_agent_system.dedup import DedupStats, canonicalize_url, dedup_snippets
+
+TEXT = (
+    "HubSpot Starter costs $20 per user per month and includes email marketing, "
+    "forms, live chat and simple automation for growing small business sales teams."
+)
+
+
+def _item(url, content, title="HubSpot pricing"):
+    return {"url": url, "title": title, "content": content}
+
+
+def test_url_variants_collapse():
+    variants = [
+        "https://www.hubspot.com/pricing/crm/",
+        "http://hubspot.com/pricing/crm?utm_source=news&utm_medium=email",
+        "https://HubSpot.com/pricing/crm#starter",
+        "https://hubspot.com:443/pricing//crm?gclid=abc&ref=x",
+    ]
+    assert {canonicalize_url(u) for u in variants} == {"hubspot.com/pricing/crm"}
+    assert canonicalize_url("https://hubspot.com/pricing?plan=pro") != canonicalize_url("https://hubspot.com/pricing")
+    groups = {"pricing": [_item(u, f"{TEXT} variant {i}") for i, u in enumerate(variants)]}
+    kept, stats = dedup_snippets(groups)
+    assert kept["pricing"] == groups["pricing"][:1]
+    assert stats.url_duplicates == 3
+
+
+def test_near_duplicate_dropped_distinct_kept():
+    groups = {"pricing": [
+        _item("https://hubspot.com/pricing", TEXT),
+        _item("https://reviews.example/hubspot", TEXT.replace("sales teams.", "sales reps.")),
+        _item("https://zoho.com/crm/pricing", "Zoho CRM Standard is $14 per user per month billed annually with workflow rules."),
+    ]}
+    kept, stats = dedup_snippets(groups)
+    assert [i["url"] for i in kept["pricing"]] == ["https://hubspot.com/pricing", "https://zoho.com/crm/pricing"]
+    assert stats.near_duplicates == 1
+
+
+def test_first_occurrence_wins_across_aspects():
+    first = _item("https://hubspot.com/pricing", TEXT)
+    groups = {
+        "pricing": [first],
+        "features": [_item("https://www.hubspot.com/pricing/", TEXT, title="HubSpot features"),
+                     _item("https://blog.example/hubspot", TEXT)],
+    }
+    kept, _ = dedup_snippets(groups)
+    assert kept == {"pricing": [first], "features": []}
+
+
+def test_stats_counts():
+    groups = {
+        "pricing": [_item("https://a.example/p", TEXT), _item("https://a.example/p?utm_campaign=x", "other text entirely")],
+        "features": [_item("https://b.example/f", TEXT), "raw string result",
+                     _item("https://c.example/f", "Automation workflows, lead scoring and custom dashboards.")],
+    }
+    kept, stats = dedup_snippets(groups)
+    assert stats == DedupStats(total=5, url_duplicates=1, near_duplicates=1)
+    assert (stats.dropped, stats.kept) == (2, 3)
+    assert sum(len(v) for v in kept.values()) == stats.kept
@@ -0,0 +1,64 @@
+import json
+import multiprocessing
+
+from crm_agent_system import history
+from crm_agent_system.config import config
+
+COMPARISON = {
+    "scores": {"Zoho": {"pricing": 0.8, "features": 0.5, "integrations": 0.4, "overall": 0.6}},
+    "detailed_data": {"Zoho": {}},
+    "timestamp": "2026-01-01T00:00:00",
+}
+
+
+def test_reused_trace_id_is_not_recorded_twice(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "history_dir", str(tmp_path))
+    assert history.record_comparison("run1", COMPARISON) == 1
+    assert history.record_comparison("run1", COMPARISON) == 0
+    assert len(history.HistoryStore().time_series("Zoho", "overall")) == 1
+
+
+def test_cli_prints_missing_metrics_as_null(tmp_path, capsys):
+    history.HistoryStore(str(tmp_path)).append_run("run1", COMPARISON)
+    history.main(["--dir", str(tmp_path), "series", "Zoho", "min_price"])
+    out = capsys.readouterr().out
+    assert "NaN" not in out
+    assert json.loads(out)[0]["value"] is None
+
+
+def _append_runs(root, worker):
+    store = history.HistoryStore(root)
+    for i in range(30):
+        value = worker * 100 + i
+        comparison = {"scores": {crm: {"overall": float(value)} for crm in ("A", "B")}, "timestamp": "2026-01-01T00:00:00"}
+        store.append_run(f"w{worker}-{i}", comparison)
+
+
+def test_concurrent_appends_keep_rows_aligned(tmp_path):
+    root = str(tmp_path)
+    procs = [multiprocessing.Process(target=_append_runs, args=(root, w)) for w in (1, 2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+    store = history.HistoryStore(root)
+    for crm in ("A", "B"):
+        series = store.time_series(crm, "overall")
+        assert len(series) == 60
+        for point in series:
+            worker, i = point["run"][1:].split("-")
+            assert point["value"] == int(worker) * 100 + int(i)
+
+
+def test_crashed_append_is_dropped_not_skipped(tmp_path):
+    store = history.HistoryStore(str(tmp_path))
+    store.append_run("run1", COMPARISON)
+    # Simulate a crash after the columns were written but before the run was registered
+    registered = (tmp_path / "runs.jsonl").read_text()
+    store.append_run("run2", COMPARISON)
+    (tmp_path / "runs.jsonl").write_text(registered)
+    store = history.HistoryStore(str(tmp_path))
+    assert store.runs.get("run2") is None
+    assert [p["run"] for p in store.time_series("Zoho", "overall")] == ["run1"]
+    store.append_run("run2", COMPARISON)
+    assert [p["run"] for p in history.HistoryStore(str(tmp_path)).time_series("Zoho", "overall")] == ["run1", "run2"]
@@ -0,0 +1,32 @@
+import asyncio
+import json
+
+from crm_agent_system.agents.research import ResearchAgent
+from crm_agent_system.config import config
+from crm_agent_system.model_router import ModelRouter, StubChatModel
+
+SNIPPETS = json.dumps([json.dumps([
+    {"title": "Zoho pricing", "content": "Standard: $14/user/month. Professional: $23/user/month."},
+])])
+
+
+def _extract(monkeypatch, broken_model):
+    monkeypatch.setattr(config, "model_routing", True)
+    monkeypatch.setattr(config, "model_escalation_confidence", 0.9)
+    router = ModelRouter(lambda model: StubChatModel(model, broken=model == broken_model),
+                         {"extraction": "fast", "summary": "", "reask": "strong"})
+    agent = ResearchAgent(router.llm("extraction"), search_tool=None, router=router)
+    data = asyncio.run(agent._extract_routed("Zoho", SNIPPETS, set()))
+    return data, router
+
+
+def test_parse_failure_escalates_to_reask_model(monkeypatch):
+    data, router = _extract(monkeypatch, broken_model="fast")
+    assert router.summary() == {"calls": {"fast": 1, "strong": 1}, "escalations": {"fast->strong": 1}}
+    assert [t.name for t in data.pricing_tiers] == ["Standard", "Professional"]
+
+
+def test_better_result_is_kept_when_reask_fails(monkeypatch):
+    data, router = _extract(monkeypatch, broken_model="strong")
+    assert router.escalations["fast->strong"] == 1
+    assert data.confidence_score > 0.2 and [t.name for t in data.pricing_tiers] == ["Standard", "Professional"]
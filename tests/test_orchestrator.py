@@ -0,0 +1,21 @@
+from crm_agent_system.agents.orchestrator import OrchestratorAgent
+from crm_agent_system.config import config
+
+
+def test_precheck_retries_never_converge(monkeypatch):
+    monkeypatch.setattr(config, "crms", ["A", "B"])
+    monkeypatch.setattr(config, "max_research_attempts", 4)
+    monkeypatch.setattr(config, "max_iterations", 20)
+    orchestrator = OrchestratorAgent(llm=None)
+    state = {"crm_data": {"A": {}, "B": {}}, "research_attempts": {"A": 1, "B": 1},
+             "precheck_retry": ["A"], "convergence_history": ["research"]}
+    tasks = []
+    for _ in range(6):
+        state = orchestrator(state)
+        tasks.append(state["current_task"])
+        if state["current_task"] != "research":
+            break
+        state["research_attempts"]["A"] += 1
+    # Three retry rounds (attempts 2..4), then the exhausted CRM is analyzed instead
+    assert tasks == ["research", "research", "research", "analyze"]
+    assert "complete" not in tasks
@@ -0,0 +1,19 @@
+import json
+
+from crm_agent_system.query_plan import PlanStats
+
+
+def test_plan_stats_persist_once_per_flush(tmp_path):
+    path = tmp_path / "plan.json"
+    stats = PlanStats(str(path))
+    for _ in range(3):
+        stats.record("single:pricing", 1, {"pricing": 2}, {"pricing": 4})
+    assert not path.exists()
+    PlanStats(str(path)).flush()  # nothing pending: no write
+    assert not path.exists()
+    stats.flush()
+    other = PlanStats(str(path))
+    other.record("single:pricing", 1, {"pricing": 1}, {"pricing": 1})
+    other.flush()
+    entry = json.loads(path.read_text())["single:pricing"]
+    assert entry == {"runs": 4, "calls": 4, "hits": {"pricing": 7}, "units": {"pricing": 13}}
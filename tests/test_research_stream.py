@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from langgraph.graph import END, StateGraph
+
+from crm_agent_system.agents.research import ResearchAgent
+from crm_agent_system.config import config
+from crm_agent_system.model_router import ModelRouter, StubChatModel
+from crm_agent_system.models import AgentState
+
+
+class _Search:
+    """Search tool stand-in: "Slow" answers only once the test has seen "Fast" streamed."""
+
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+
+    async def ainvoke(self, args):
+        if args["crm_name"] == "Slow":
+            await asyncio.wait_for(self.release.wait(), timeout=5)
+        content = f"{args['crm_name']} Starter: $20/user/month. Key features: contacts, pipelines."
+        return json.dumps([{"title": args["crm_name"], "url": f"https://{args['crm_name']}.example/{args['aspect']}", "content": content}])
+
+
+def test_research_streams_each_crm_before_the_node_returns(monkeypatch):
+    monkeypatch.setattr(config, "crms", ["Slow", "Fast"])
+    monkeypatch.setattr(config, "llm_provider", "stub")
+    monkeypatch.setattr(config, "research_backend", "local")
+
+    async def run():
+        release = asyncio.Event()
+        router = ModelRouter(StubChatModel)
+        graph = StateGraph(AgentState)
+        graph.add_node("research", ResearchAgent(router.llm("extraction"), _Search(release), router=router))
+        graph.set_entry_point("research")
+        graph.add_edge("research", END)
+        events = []
+        state = {"crm_data": {}, "research_status": {}, "research_attempts": {}, "error_log": []}
+        async for mode, chunk in graph.compile().astream(state, stream_mode=["custom", "updates"]):
+            events.append((mode, chunk["crm"] if mode == "custom" else "research done"))
+            if mode == "custom" and chunk["crm"] == "Fast":
+                release.set()
+        return events
+
+    assert asyncio.run(run()) == [("custom", "Fast"), ("custom", "Slow"), ("updates", "research done")]
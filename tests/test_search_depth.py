@@ -0,0 +1,53 @@
+import json
+import multiprocessing
+
+from crm_agent_system import search_depth
+from crm_agent_system.config import config
+from crm_agent_system.search_depth import DepthHistory
+
+
+def _record_and_flush(path):
+    config.adaptive_history_path = path
+    history = DepthHistory()
+    for _ in range(20):
+        history.record("pricing", 4, expansions=1, paid=1)
+    history.flush()
+
+
+def test_concurrent_flushes_merge(tmp_path):
+    path = str(tmp_path / "depth.json")
+    procs = [multiprocessing.Process(target=_record_and_flush, args=(path,)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+    entry = json.loads((tmp_path / "depth.json").read_text())["pricing"]
+    assert entry["runs"] == 80 and entry["expansions"] == 80
+
+
+def test_record_is_not_persisted_until_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "adaptive_history_path", str(tmp_path / "depth.json"))
+    monkeypatch.setattr(search_depth, "_history", None)
+    search_depth.get_depth_history().record("features", 3)
+    assert not (tmp_path / "depth.json").exists()
+    search_depth.flush_depth_history()
+    assert json.loads((tmp_path / "depth.json").read_text())["features"]["runs"] == 1
+
+
+def test_expansion_gated_by_payoff(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "adaptive_explore_expansions", 3)
+    monkeypatch.setattr(config, "adaptive_min_expansion_payoff", 0.5)
+    history = DepthHistory(str(tmp_path / "depth.json"))
+    assert history.expansion_pays("integrations")  # exploring
+    history.record("integrations", 8, expansions=4, paid=1)
+    assert not history.expansion_pays("integrations")
+    history.record("integrations", 8, expansions=0, paid=0)
+    history.record("pricing", 8, expansions=4, paid=3)
+    assert history.expansion_pays("pricing")
+
+
+def test_pricing_units_need_a_price():
+    query_echo = {"title": "HubSpot CRM pricing plans", "content": "Best CRM for small business B2B teams, pro tips"}
+    priced = {"title": "Pricing", "content": "Free for 3 users. Starter: $20/month. Professional plan at $890/month"}
+    assert search_depth.evidence_units("pricing", [query_echo]) == set()
+    assert search_depth.evidence_units("pricing", [priced]) == {"free", "starter", "professional", "$20", "$890"}
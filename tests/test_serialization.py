@@ -0,0 +1,29 @@
+import json
+
+from crm_agent_system.models import CRMData
+from crm_agent_system.serialization import crm_from_json, load_records, load_report_crms, save_records
+from crm_agent_system.workqueue import SQLiteWorkQueue
+
+CRM = CRMData(name="Zoho", limitations=["Steep learning curve"], confidence_score=0.6)
+
+
+def test_records_round_trip(tmp_path):
+    path = tmp_path / "records.jsonl"
+    save_records(path, [CRM, CRMData(name="HubSpot")])
+    assert load_records(path) == [CRM, CRMData(name="HubSpot")]
+
+
+def test_report_placeholders_are_skipped(tmp_path):
+    path = tmp_path / "crm_report_x.json"
+    path.write_text(json.dumps({"scores": {}, "detailed_data": {"Zoho": CRM.model_dump(), "Failed": {}}}))
+    assert load_report_crms(path) == {"Zoho": CRM}
+
+
+def test_queue_result_validates_from_stored_json(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    job_id = queue.submit("research", {"crm_name": "Zoho"})
+    job = queue.lease("w1")
+    assert queue.complete(job.id, "w1", CRM.model_dump())
+    info = queue.statuses([job_id], raw=True)[job_id]
+    assert isinstance(info["result"], str)
+    assert crm_from_json(info["result"]) == CRM
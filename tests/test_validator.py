@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from crm_agent_system.agents.validator import feature_overlap_pairs, normalize_feature
+from crm_agent_system.models import CRMData, CRMFeatures
+
+VOCAB = [f"Feature {i}" for i in range(25)] + ["Custom Reports", "custom-report", "Lead Scoring", "lead scorings"]
+
+
+def _pool(seed: int, n: int = 60):
+    rng = random.Random(seed)
+    pool = {}
+    for i in range(n):
+        if i and rng.random() < 0.3:  # near copy of an earlier CRM, so overlaps actually occur
+            base = list(pool[f"crm-{rng.randrange(i)}"].features.core_features)
+            feats = base[: max(len(base) - rng.randint(0, 2), 0)] + rng.sample(VOCAB, rng.randint(0, 2))
+        else:
+            feats = rng.sample(VOCAB, rng.randint(0, 8))
+        pool[f"crm-{i}"] = CRMData(name=f"crm-{i}", features=CRMFeatures(core_features=feats))
+    pool["failed"] = {}  # research failure placeholder
+    return pool
+
+
+def _pairwise(crm_data, ratio):
+    """The validator's original O(n^2) rule, applied to normalized feature sets."""
+    seen, pairs = {}, []
+    for name, data in crm_data.items():
+        if isinstance(data, CRMData):
+            feats = {normalize_feature(f) for f in data.features.core_features} - {""}
+            for other, other_feats in seen.items():
+                overlap = feats & other_feats
+                if overlap and len(overlap) > ratio * len(feats):
+                    pairs.append((name, other))
+            seen[name] = feats
+    return pairs
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("ratio", [0.5, 0.8])
+def test_indexed_overlap_matches_pairwise_scan(seed, ratio):
+    pool = _pool(seed)
+    expected = _pairwise(pool, ratio)
+    assert expected  # the pools do contain overlapping CRMs
+    assert feature_overlap_pairs(pool, ratio) == expected
+
+
+def test_feature_names_are_normalized():
+    assert normalize_feature("Custom Reports") == normalize_feature("custom-report")
+    a = CRMData(name="A", features=CRMFeatures(core_features=["Custom Reports"]))
+    b = CRMData(name="B", features=CRMFeatures(core_features=["custom-report"]))
+    assert feature_overlap_pairs({"A": a, "B": b}) == [("B", "A")]
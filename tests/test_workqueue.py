@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import time
+
+from crm_agent_system.config import config
+from crm_agent_system.worker import RESEARCH_JOB, RESEARCH_SETTINGS, apply_research_settings, research_payload, start_workers
+from crm_agent_system.workqueue import SQLiteWorkQueue, dispatch_and_wait
+
+
+def _echo_handler():
+    async def handle(payload):
+        await asyncio.sleep(0.05)
+        return {"crm_name": payload["crm_name"], "pid": os.getpid()}
+
+    return handle
+
+
+def test_worker_processes_drain_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "queue_poll_interval", 0.02)
+    path = str(tmp_path / "queue.db")
+    queue = SQLiteWorkQueue(path)
+    procs = start_workers(4, path, idle_exit=2.0, log_level="WARNING", handler_factory=_echo_handler)
+    try:
+        payloads = [{"crm_name": f"crm-{i}"} for i in range(40)]
+        results = asyncio.run(dispatch_and_wait(queue, RESEARCH_JOB, payloads, timeout=60))
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+    assert [r["crm_name"] for r in results] == [p["crm_name"] for p in payloads]
+    assert len({r["pid"] for r in results}) > 1
+    assert all(p.exitcode == 0 for p in procs)
+
+
+def test_timeout_cancels_unfinished_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "queue_poll_interval", 0.02)
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    results = asyncio.run(dispatch_and_wait(queue, RESEARCH_JOB, [{"crm_name": "a"}, {"crm_name": "b"}], timeout=0.1))
+    assert all(isinstance(r, TimeoutError) for r in results)
+    # A worker starting later must not pick the abandoned jobs up
+    assert queue.lease("late-worker", [RESEARCH_JOB]) is None
+
+
+def test_statuses_and_purge(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    done_id = queue.submit(RESEARCH_JOB, {"crm_name": "a"})
+    pending_id = queue.submit(RESEARCH_JOB, {"crm_name": "b"})
+    job = queue.lease("w1", [RESEARCH_JOB])
+    assert job.id == done_id
+    queue.complete(job.id, "w1", {"ok": True})
+    info = queue.statuses([done_id, pending_id, "nope"])
+    assert info[done_id]["status"] == "done" and info[done_id]["result"] == {"ok": True}
+    assert info[pending_id]["status"] == "pending"
+    assert info["nope"]["status"] == "missing"
+    time.sleep(0.01)
+    assert queue.purge(older_than=0) == 1
+    assert queue.status(done_id)["status"] == "missing"
+    assert queue.status(pending_id)["status"] == "pending"
+
+
+def _slow_handler():
+    async def handle(payload):
+        await asyncio.sleep(3)
+        open(payload["marker"], "w").close()
+        return {}
+
+    return handle
+
+
+def test_worker_abandons_cancelled_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "queue_poll_interval", 0.02)
+    monkeypatch.setattr(config, "queue_lease_seconds", 0.3)
+    path = str(tmp_path / "queue.db")
+    marker = tmp_path / "finished"
+    procs = start_workers(1, path, max_jobs=1, log_level="ERROR", handler_factory=_slow_handler)
+    try:
+        results = asyncio.run(dispatch_and_wait(SQLiteWorkQueue(path), RESEARCH_JOB, [{"marker": str(marker)}], timeout=0.5))
+        assert isinstance(results[0], TimeoutError)
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+    assert procs[0].exitcode == 0
+    assert not marker.exists()
+
+
+def test_research_payload_carries_driver_settings(monkeypatch):
+    monkeypatch.setattr(config, "dedup_enabled", False)
+    monkeypatch.setattr(config, "query_planning", True)
+    monkeypatch.setattr(config, "llm_task_models", {"extraction": "fast", "summary": "", "reask": "strong"})
+    payload = json.loads(json.dumps(research_payload("Zoho")))  # as stored in the queue
+    assert set(RESEARCH_SETTINGS) <= set(payload)
+    # A worker with different local settings adopts the driver's
+    monkeypatch.setattr(config, "dedup_enabled", True)
+    monkeypatch.setattr(config, "query_planning", False)
+    monkeypatch.setattr(config, "llm_task_models", {})
+    apply_research_settings(payload)
+    assert config.dedup_enabled is False and config.query_planning is True
+    assert config.llm_task_models["extraction"] == "fast"